@@ -1,14 +1,23 @@
 import streamlit as st
-from db.database import Database
+from app.config import Config
+from app.resources import get_database
+from app import exporter
 import pandas as pd
+import io
 from datetime import datetime
 
+try:
+    # Optional: search as you type (debounced) instead of on Enter
+    from st_keyup import st_keyup
+except ImportError:
+    st_keyup = None
+
 
 class AdminDashboard:
     """Admin dashboard for viewing and managing bookings"""
     
     def __init__(self):
-        self.db = Database()
+        self.db = get_database()
     
     def render(self):
         """Render the admin dashboard"""
@@ -23,70 +32,131 @@ class AdminDashboard:
         # Search and filters
         col1, col2 = st.columns([3, 1])
         with col1:
-            search_term = st.text_input("🔍 Search by name or email", "")
+            label = "🔍 Search by name, email, phone or booking ID"
+            if st_keyup:
+                search_term = st_keyup(label, debounce=Config.ADMIN_SEARCH_DEBOUNCE_MS, key="admin_search") or ""
+            else:
+                search_term = st.text_input(label, "")
         with col2:
             st.write("")
             st.write("")
             if st.button("🔄 Refresh", use_container_width=True):
+                self.db.invalidate_cache()
+                st.session_state.admin_cursors = [None]
                 st.rerun()
         
+        self.render_export()
+        
         # Get bookings
+        search_term = search_term.strip()
         if search_term:
-            bookings = self.db.search_bookings(search_term)
-        else:
-            bookings = self.db.get_all_bookings()
-        
-        # Display bookings
-        if bookings:
-            self.render_bookings_table(bookings)
+            if len(search_term) < Config.ADMIN_SEARCH_MIN_CHARS and not search_term.lstrip("#").isdigit():
+                st.caption(f"Type at least {Config.ADMIN_SEARCH_MIN_CHARS} characters to search.")
+                return
+            bookings = self.db.search_bookings(search_term, Config.ADMIN_SEARCH_LIMIT)
+            if bookings:
+                self.render_bookings_table(bookings)
+            else:
+                st.info("No bookings found.")
         else:
-            st.info("No bookings found.")
+            self.render_bookings_page()
     
     def render_stats(self):
         """Render statistics cards"""
-        bookings = self.db.get_all_bookings()
+        stats = self.db.get_booking_stats()
         
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("📊 Total Bookings", len(bookings))
+            st.metric("📊 Total Bookings", stats["total"])
         
         with col2:
-            today_bookings = [
-                b for b in bookings 
-                if b.get('date') == datetime.now().strftime('%Y-%m-%d')
-            ]
-            st.metric("📅 Today's Bookings", len(today_bookings))
+            st.metric("📅 Today's Bookings", stats["today"])
         
         with col3:
-            confirmed = [b for b in bookings if b.get('status') == 'confirmed']
-            st.metric("✅ Confirmed", len(confirmed))
+            st.metric("✅ Confirmed", stats["confirmed"])
         
         with col4:
-            unique_customers = len(set(b.get('customer_id') for b in bookings))
-            st.metric("👥 Unique Customers", unique_customers)
+            st.metric("👥 Unique Customers", stats["unique_customers"])
+    
+    def render_bookings_page(self):
+        """Render one page of bookings; only that page is fetched"""
+        page_size = st.selectbox("Rows per page", Config.ADMIN_PAGE_SIZES, index=1)
+        
+        # Cursors of the pages visited so far; [None] is the first page
+        if st.session_state.get("admin_page_size") != page_size:
+            st.session_state.admin_page_size = page_size
+            st.session_state.admin_cursors = [None]
+        cursors = st.session_state.admin_cursors
+        
+        page = self.db.get_bookings_page(page_size, cursors[-1])
+        if not page["rows"]:
+            st.info("No bookings found.")
+            return
+        
+        self.render_bookings_table(page["rows"])
+        
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            if st.button("⬅️ Previous", disabled=len(cursors) == 1, use_container_width=True):
+                cursors.pop()
+                st.rerun()
+        with col2:
+            st.caption(f"Page {len(cursors)} · ~{page['total']} bookings")
+        with col3:
+            if st.button("Next ➡️", disabled=page["next_cursor"] is None, use_container_width=True):
+                cursors.append(page["next_cursor"])
+                st.rerun()
+    
+    @staticmethod
+    def bookings_frame(bookings) -> pd.DataFrame:
+        """Booking dicts -> display DataFrame, built column-wise"""
+        # Flattens the nested customers payload into customers.name etc. in one pass
+        raw = pd.json_normalize(bookings)
+        
+        def column(name):
+            return raw[name] if name in raw else pd.Series(None, index=raw.index, dtype=object)
+        
+        # Every configured department is a category (even if absent from these rows) so breakdowns line up
+        booking_type = column('booking_type').astype('category')
+        booking_type = booking_type.cat.add_categories(
+            [t for t in Config.BOOKING_TYPES if t not in booking_type.cat.categories]
+        )
+        # Free-form column: 'confirmed' and 'Confirmed' are one category
+        status = column('status').fillna('N/A').astype('string').str.upper().astype('category')
+        return pd.DataFrame({
+            'ID': column('id'),
+            'Name': column('customers.name').fillna('N/A'),
+            'Email': column('customers.email').fillna('N/A'),
+            'Phone': column('customers.phone').fillna('N/A'),
+            'Type': booking_type,
+            'Date': pd.to_datetime(column('date'), format='%Y-%m-%d', errors='coerce'),
+            'Time': column('time').astype('string').str.slice(0, 5),
+            'Status': status,
+            'Created': pd.to_datetime(column('created_at'), format='ISO8601', errors='coerce').dt.normalize()
+        })
     
     def render_bookings_table(self, bookings):
         """Render bookings in a table"""
         st.subheader("All Bookings")
         
-        # Convert to DataFrame
-        data = []
-        for booking in bookings:
-            customer = booking.get('customers', {})
-            data.append({
-                'ID': booking.get('id'),
-                'Name': customer.get('name', 'N/A'),
-                'Email': customer.get('email', 'N/A'),
-                'Phone': customer.get('phone', 'N/A'),
-                'Type': booking.get('booking_type', 'N/A'),
-                'Date': booking.get('date', 'N/A'),
-                'Time': booking.get('time', 'N/A'),
-                'Status': booking.get('status', 'N/A').upper(),
-                'Created': booking.get('created_at', 'N/A')[:10]
-            })
-        
-        df = pd.DataFrame(data)
+        df = self.bookings_frame(bookings)
+        
+        # Filters and sorting (vectorized over the frame)
+        col1, col2, col3 = st.columns([2, 2, 1])
+        with col1:
+            types = st.multiselect("Department", list(df['Type'].cat.categories), key="admin_filter_type")
+        with col2:
+            statuses = st.multiselect("Status", list(df['Status'].cat.categories), key="admin_filter_status")
+        with col3:
+            sort_by = st.selectbox("Sort by", ["Created", "Date", "Name", "Type"], key="admin_sort")
+        
+        if types:
+            df = df[df['Type'].isin(types)]
+        if statuses:
+            df = df[df['Status'].isin(statuses)]
+        ascending = sort_by in ("Name", "Type")
+        df = df.sort_values([sort_by, 'ID'], ascending=[ascending, False], kind='stable')
         
         # Display with styling
         st.dataframe(
@@ -98,19 +168,71 @@ class AdminDashboard:
                     "ID",
                     width="small"
                 ),
+                "Date": st.column_config.DateColumn("Date", format="YYYY-MM-DD"),
                 "Status": st.column_config.TextColumn(
                     "Status",
                     width="small"
-                )
+                ),
+                "Created": st.column_config.DateColumn("Created", format="YYYY-MM-DD")
             }
         )
         
-        # Export option
-        if st.button("📥 Export to CSV"):
-            csv = df.to_csv(index=False)
-            st.download_button(
-                label="Download CSV",
-                data=csv,
-                file_name=f"bookings_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv"
-            )
\ No newline at end of file
+        # Per-department breakdown of the rows shown
+        breakdown = df['Type'].value_counts(sort=False)
+        if len(df):
+            st.caption("Bookings by department (shown rows)")
+            st.bar_chart(breakdown[breakdown > 0])
+    
+    def render_export(self):
+        """
+        Export all bookings matching the filters, streamed from the database page by page.
+        The download itself is held in memory by Streamlit, so it is capped at EXPORT_MAX_BYTES.
+        """
+        with st.expander("📥 Export bookings"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                date_from = st.date_input("From", value=None)
+            with col2:
+                date_to = st.date_input("To", value=None)
+            with col3:
+                formats = ["CSV", "Parquet"] if exporter.parquet_available() else ["CSV"]
+                file_format = st.radio("Format", formats, horizontal=True)
+            booking_types = st.multiselect("Departments", Config.BOOKING_TYPES)
+            
+            if st.button("Prepare export"):
+                pages = self.db.iter_bookings(
+                    date_from=date_from.isoformat() if date_from else None,
+                    date_to=date_to.isoformat() if date_to else None,
+                    booking_types=booking_types or None,
+                    page_size=Config.EXPORT_PAGE_SIZE
+                )
+                try:
+                    with st.spinner("Exporting..."):
+                        if file_format == "Parquet":
+                            out, mime = exporter.export_parquet(pages), "application/vnd.apache.parquet"
+                        else:
+                            out, mime = exporter.export_csv(pages), "text/csv"
+                except Exception as e:
+                    st.error(f"Export failed: {str(e)}")
+                    return
+                
+                # st.download_button only takes bytes/str (not file-like spools) and keeps
+                # them in Streamlit's in-memory media store, so the whole export is in
+                # memory once handed over - refuse exports above EXPORT_MAX_BYTES
+                with out:
+                    size = out.seek(0, io.SEEK_END)
+                    if size > Config.EXPORT_MAX_BYTES:
+                        st.error(
+                            f"Export is {size / 1024 / 1024:.0f} MB, over the "
+                            f"{Config.EXPORT_MAX_BYTES / 1024 / 1024:.0f} MB download limit. "
+                            "Narrow the date range or departments."
+                        )
+                        return
+                    out.seek(0)
+                    data = out.read()  # CSV reads as str, Parquet as bytes
+                st.download_button(
+                    label=f"Download {file_format}",
+                    data=data,
+                    file_name=f"bookings_{datetime.now().strftime('%Y%m%d')}.{file_format.lower()}",
+                    mime=mime
+                )
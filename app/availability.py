@@ -0,0 +1,156 @@
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from app.config import Config
+
+
+def _minutes(hhmm: str) -> int:
+    hours, minutes = hhmm[:5].split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+class AvailabilityIndex:
+    """
+    In-memory index of open and taken appointment slots.
+
+    A day is split into SLOT_MINUTES slots; slot i starts at i * SLOT_MINUTES
+    after midnight. Each department's opening hours for a weekday are a bitmask
+    of its open slots, and the taken slots of every (booking_type, date) are a
+    bitmask too, so "is this free" and "next free slot" are a few integer ops
+    per day instead of a database query.
+
+    The index is loaded from the bookings table through `loader`, updated in
+    place as bookings are made, and reloaded every AVAILABILITY_REFRESH_SECONDS
+    to pick up bookings made by other processes. The unique index on bookings
+    in db/schema.sql remains the final guard against double-booking.
+    """
+
+    def __init__(self, loader: Callable[[str], Optional[Iterable[Dict]]] = None,
+                 schedules: Dict = None, slot_minutes: int = None):
+        self.loader = loader
+        self.schedules = schedules or Config.DEPARTMENT_SCHEDULES
+        self.slot_minutes = slot_minutes or Config.SLOT_MINUTES
+        self.taken: Dict[Tuple[str, str], int] = {}
+        self.loaded_at = 0.0
+        self._lock = threading.Lock()
+
+        # (booking_type, weekday) -> bitmask of slots open for booking
+        self.open_masks: Dict[Tuple[str, int], int] = {}
+        for booking_type, schedule in self.schedules.items():
+            first = _minutes(schedule["start"]) // self.slot_minutes
+            last = _minutes(schedule["end"]) // self.slot_minutes  # Last slot must end by closing
+            mask = ((1 << last) - 1) & ~((1 << first) - 1)
+            for weekday in schedule["days"]:
+                self.open_masks[(booking_type, weekday)] = mask
+
+    # Slot helpers
+
+    def slot_index(self, time_str: str) -> Optional[int]:
+        """Slot starting at HH:MM, or None if HH:MM is not on a slot boundary"""
+        minutes = _minutes(time_str)
+        if minutes % self.slot_minutes:
+            return None
+        return minutes // self.slot_minutes
+
+    def slot_time(self, index: int) -> str:
+        minutes = index * self.slot_minutes
+        return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+    def open_mask(self, booking_type: str, day: date) -> int:
+        return self.open_masks.get((booking_type, day.weekday()), 0)
+
+    def describe_hours(self, booking_type: str) -> str:
+        """Human readable opening hours, e.g. 'Tue, Thu 14:00-18:00'"""
+        schedule = self.schedules.get(booking_type)
+        if not schedule:
+            return ""
+        days = ", ".join(["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"][d] for d in schedule["days"])
+        return f"{days} {schedule['start']}-{schedule['end']}"
+
+    # Loading and incremental updates
+
+    def load(self, rows: Iterable[Dict]) -> None:
+        """Replace the taken slots with bookings rows (booking_type, date, time)"""
+        taken = {}
+        for row in rows:
+            index = self.slot_index(row["time"])
+            if index is None:
+                # Legacy booking off the slot grid - block the slot it falls in
+                index = _minutes(row["time"]) // self.slot_minutes
+            key = (row["booking_type"], str(row["date"]))
+            taken[key] = taken.get(key, 0) | (1 << index)
+
+        with self._lock:
+            self.taken = taken
+            self.loaded_at = time.time()
+
+    def refresh(self, force: bool = False) -> None:
+        """Reload from the database when stale; a failed load keeps the current index"""
+        if self.loader is None:
+            return
+        if not force and time.time() - self.loaded_at < Config.AVAILABILITY_REFRESH_SECONDS:
+            return
+        rows = self.loader(datetime.now().date().isoformat())
+        if rows is not None:
+            self.load(rows)
+
+    def reserve(self, booking_type: str, date_str: str, time_str: str) -> bool:
+        """Mark a slot taken; False if it already was"""
+        bit = 1 << self.slot_index(time_str)
+        with self._lock:
+            key = (booking_type, date_str)
+            if self.taken.get(key, 0) & bit:
+                return False
+            self.taken[key] = self.taken.get(key, 0) | bit
+            return True
+
+    def release(self, booking_type: str, date_str: str, time_str: str) -> None:
+        """Free a slot, e.g. after a cancellation"""
+        bit = 1 << self.slot_index(time_str)
+        with self._lock:
+            key = (booking_type, date_str)
+            self.taken[key] = self.taken.get(key, 0) & ~bit
+
+    # Queries
+
+    def _free_mask(self, booking_type: str, day: date) -> int:
+        return self.open_mask(booking_type, day) & ~self.taken.get((booking_type, day.isoformat()), 0)
+
+    def is_open(self, booking_type: str, date_str: str, time_str: str) -> bool:
+        """Whether the department sees patients in this slot"""
+        index = self.slot_index(time_str)
+        day = datetime.strptime(date_str, '%Y-%m-%d').date()
+        return index is not None and bool(self.open_mask(booking_type, day) >> index & 1)
+
+    def is_free(self, booking_type: str, date_str: str, time_str: str) -> bool:
+        """Whether the slot is open and not yet booked"""
+        self.refresh()
+        index = self.slot_index(time_str)
+        day = datetime.strptime(date_str, '%Y-%m-%d').date()
+        return index is not None and bool(self._free_mask(booking_type, day) >> index & 1)
+
+    def free_slots(self, booking_type: str, date_str: str) -> List[str]:
+        """Start times of all free slots on a date"""
+        self.refresh()
+        mask = self._free_mask(booking_type, datetime.strptime(date_str, '%Y-%m-%d').date())
+        return [self.slot_time(i) for i in range(mask.bit_length()) if mask >> i & 1]
+
+    def next_free_slot(self, booking_type: str, after: datetime = None,
+                       horizon_days: int = 90) -> Optional[Tuple[str, str]]:
+        """Earliest free (date, time) at or after `after` (default: now) within the booking window"""
+        self.refresh()
+        after = after or datetime.now()
+        first_slot = -(-(after.hour * 60 + after.minute) // self.slot_minutes)  # Round up
+
+        day = after.date()
+        last_day = datetime.now().date() + timedelta(days=horizon_days)
+        while day <= last_day:
+            mask = self._free_mask(booking_type, day)
+            if day == after.date():
+                mask &= ~((1 << first_slot) - 1)
+            if mask:
+                lowest = (mask & -mask).bit_length() - 1
+                return day.isoformat(), self.slot_time(lowest)
+            day += timedelta(days=1)
+        return None
@@ -0,0 +1,85 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by do does for from how i in is it of on or our "
+    "the to we what when where which who why with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case alphanumeric tokens without stopwords"""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """In-memory inverted index with Okapi BM25 scoring, built alongside the FAISS index"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)  # term -> {chunk_id: tf}
+        self.doc_terms: Dict[str, List[str]] = {}  # chunk_id -> distinct terms (for removal)
+        self.doc_len: Dict[str, int] = {}
+        self.total_len = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    def add(self, chunk_id: str, text: str) -> None:
+        """Index one chunk"""
+        if chunk_id in self.doc_len:
+            self.remove(chunk_id)
+
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            self.postings[term][chunk_id] = tf
+
+        length = sum(counts.values())
+        self.doc_terms[chunk_id] = list(counts)
+        self.doc_len[chunk_id] = length
+        self.total_len += length
+
+    def remove(self, chunk_id: str) -> None:
+        """Drop one chunk - touches only that chunk's terms"""
+        for term in self.doc_terms.pop(chunk_id, []):
+            postings = self.postings[term]
+            postings.pop(chunk_id, None)
+            if not postings:
+                del self.postings[term]
+
+        self.total_len -= self.doc_len.pop(chunk_id, 0)
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[str, float]]:
+        """Top-k chunk ids by BM25 score"""
+        n = len(self.doc_len)
+        if not n:
+            return []
+
+        avg_len = self.total_len / n
+        scores: Dict[str, float] = defaultdict(float)
+
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for chunk_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_len[chunk_id] / avg_len)
+                scores[chunk_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists: score(id) = sum over lists of 1 / (k + rank)"""
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -3,6 +3,8 @@ from datetime import datetime, timedelta
 from typing import Dict, Optional, List
 import streamlit as st
 from app.config import Config
+from app.extraction import extract_from_message
+from app.resources import get_availability_index
 
 class BookingFlow:
     """Manages the booking conversation flow"""
@@ -27,83 +29,7 @@ class BookingFlow:
     
     def extract_info(self, user_message: str) -> Dict:
         """Extract booking information from user message"""
-        extracted = {}
-        
-        # Extract email
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        email_match = re.search(email_pattern, user_message)
-        if email_match:
-            extracted["email"] = email_match.group()
-        
-        # Extract phone (various formats)
-        phone_pattern = r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        phone_match = re.search(phone_pattern, user_message)
-        if phone_match:
-            extracted["phone"] = re.sub(r'[^\d+]', '', phone_match.group())
-        
-        # Extract date (YYYY-MM-DD or DD/MM/YYYY or variations)
-        date_patterns = [
-            r'\b(\d{4}[-/]\d{2}[-/]\d{2})\b',  # YYYY-MM-DD
-            r'\b(\d{2}[-/]\d{2}[-/]\d{4})\b',  # DD-MM-YYYY
-        ]
-        for pattern in date_patterns:
-            date_match = re.search(pattern, user_message)
-            if date_match:
-                try:
-                    date_str = date_match.group(1)
-                    if '/' in date_str or '-' in date_str:
-                        # Try different formats
-                        for fmt in ['%Y-%m-%d', '%Y/%m/%d', '%d-%m-%Y', '%d/%m/%Y']:
-                            try:
-                                parsed_date = datetime.strptime(date_str, fmt)
-                                extracted["date"] = parsed_date.strftime('%Y-%m-%d')
-                                break
-                            except:
-                                continue
-                except:
-                    pass
-        
-        # Extract time (HH:MM format)
-        time_pattern = r'\b([0-1]?[0-9]|2[0-3]):([0-5][0-9])\b'
-        time_match = re.search(time_pattern, user_message)
-        if time_match:
-            extracted["time"] = time_match.group()
-        
-        # Extract booking type FIRST (before name) to avoid conflicts
-        message_lower = user_message.lower()
-        for booking_type in Config.BOOKING_TYPES:
-            if booking_type.lower() in message_lower:
-                extracted["booking_type"] = booking_type
-                break
-        
-        # Extract name - more flexible pattern
-        if "name is" in message_lower:
-            name_match = re.search(r'name is (.+?)(?:\.|$)', user_message, re.IGNORECASE)
-            if name_match:
-                extracted["name"] = name_match.group(1).strip().title()
-        elif "i'm" in message_lower or "i am" in message_lower:
-            name_match = re.search(r"(?:i'm|i am) (.+?)(?:\.|$)", user_message, re.IGNORECASE)
-            if name_match:
-                extracted["name"] = name_match.group(1).strip().title()
-        else:
-            # If just a name is provided (common scenario when bot asks "What's your name?")
-            # Check if message is likely just a name (2-3 words, starts with capital)
-            words = user_message.strip().split()
-            if 1 <= len(words) <= 4 and words[0][0].isupper():
-                # Likely a name if no special keywords present
-                # FIXED: Also exclude booking type keywords to prevent "Dental" being treated as a name
-                booking_type_keywords = [bt.lower() for bt in Config.BOOKING_TYPES]
-                # Also check for individual words in booking types (e.g., "dental", "cardiology")
-                booking_type_words = []
-                for bt in Config.BOOKING_TYPES:
-                    booking_type_words.extend(bt.lower().split())
-                
-                exclusion_keywords = ['book', 'appointment', 'email', '@', 'phone', 'time', 'date', ':', 'http'] + booking_type_keywords + booking_type_words
-                
-                if not any(keyword in message_lower for keyword in exclusion_keywords):
-                    extracted["name"] = user_message.strip().title()
-        
-        return extracted
+        return extract_from_message(user_message)
     
     def update_booking_data(self, extracted: Dict):
         """Update booking data with extracted information"""
@@ -162,6 +88,31 @@ class BookingFlow:
             except:
                 return False, "Please provide time in HH:MM format (e.g., 14:30)."
         
+        # Validate slot availability for the chosen department
+        if data["booking_type"] and data["date"] and data["time"]:
+            availability = get_availability_index()
+            booking_type, date_str, time_str = data["booking_type"], data["date"], data["time"]
+            
+            if availability.slot_index(time_str) is None:
+                problem = f"Appointments start every {Config.SLOT_MINUTES} minutes (e.g. 14:00 or 14:30)."
+            elif not availability.is_open(booking_type, date_str, time_str):
+                problem = f"{booking_type} is not available at {time_str} on {date_str}. Hours: {availability.describe_hours(booking_type)}."
+            elif not availability.is_free(booking_type, date_str, time_str):
+                problem = f"The {time_str} {booking_type} slot on {date_str} is already booked."
+            else:
+                problem = None
+            
+            if problem:
+                # Clear the time (and the date if the department is closed that day) so the flow asks again
+                data["time"] = None
+                day = datetime.strptime(date_str, '%Y-%m-%d')
+                if not availability.open_mask(booking_type, day.date()):
+                    data["date"] = None
+                suggestion = availability.next_free_slot(booking_type, max(day, datetime.now()))
+                if suggestion:
+                    problem += f"\n\n🕐 Next free slot: **{suggestion[0]} at {suggestion[1]}**"
+                return False, f"❌ {problem}"
+        
         return True, ""
     
     def get_confirmation_message(self) -> str:
@@ -1,17 +1,25 @@
-from groq import Groq
-from typing import List, Dict
+from typing import Dict, Iterator, List, Optional, Union
 import streamlit as st
 from app.config import Config
 from app.booking_flow import BookingFlow
+from app.extraction import extract_from_document
+from app.history import SUMMARY_PROMPT, HistoryBudget
 from app.tools import Tools
+from app.resources import get_embeddings, get_intent_classifier, get_llm_cache, get_llm_gateway, get_local_router
 import re
 import json
+import time
 
 class ChatLogic:
     """Main chat logic with intent detection and routing"""
 
     def __init__(self):
-        self.client = Groq(api_key=Config.GROQ_API_KEY)
+        self.llm = get_llm_gateway()
+        self.llm_cache = get_llm_cache()
+        self.embeddings = get_embeddings()
+        self.intents = get_intent_classifier()
+        self.router = get_local_router() if Config.LOCAL_ROUTER else None
+        self.history = HistoryBudget(self.summarize_history)
         self.booking_flow = BookingFlow()
         self.tools = Tools()
         
@@ -20,45 +28,34 @@ class ChatLogic:
             st.session_state.booking_mode = None  # 'manual' or 'pdf'
         if 'pdf_uploaded' not in st.session_state:
             st.session_state.pdf_uploaded = False
+        if 'history_summary' not in st.session_state:
+            st.session_state.history_summary = {}  # Running summary of turns dropped from prompts
 
-    def detect_intent(self, message: str, chat_history: List[Dict]) -> str:
-        """Detect user intent"""
-        message_lower = message.lower()
-
-        # Check for confirmation responses
-        if st.session_state.get('awaiting_confirmation', False):
-            if any(word in message_lower for word in ['yes', 'confirm', 'correct', 'right', 'yep', 'yeah']):
-                return 'confirm_yes'
-            elif any(word in message_lower for word in ['no', 'cancel', 'wrong', 'nope']):
-                return 'confirm_no'
-        
-        # Check for greetings (at start of conversation)
-        if len(chat_history) <= 2:
-            greeting_keywords = ['hi', 'hello', 'hey', 'good morning', 'good afternoon', 'good evening', 'greetings']
-            if any(keyword in message_lower for keyword in greeting_keywords):
-                return 'greeting'
-
-        # Booking intent
-        booking_keywords = ['book', 'appointment', 'schedule', 'reservation', 'need', 'want to see', 'visit', 'consultation']
-        if any(keyword in message_lower for keyword in booking_keywords):
-            return 'booking'
+    def detect_intent(self, message: str, chat_history: List[Dict]) -> Optional[str]:
+        """Detect user intent from keywords and booking state (None if the message has no cue)"""
+        # An unfinished booking keeps routing to the booking flow
+        booking_in_progress = bool(st.session_state.get('booking_data')) and bool(self.booking_flow.get_missing_fields())
         
-        # Check if currently in booking flow
-        if st.session_state.get('booking_data'):
-            missing_fields = self.booking_flow.get_missing_fields()
-            if missing_fields:
-                return 'booking'
-
-        # Questions
-        question_keywords = ['what', 'how', 'when', 'where', 'who', 'why', 'tell me', 'explain']
-        if any(keyword in message_lower for keyword in question_keywords):
-            return 'question'
-
-        return 'general'
-
-    def handle_message(self, message: str, chat_history: List[Dict]) -> str:
-        """Route messages to correct handler"""
+        return self.intents.keyword_intent(
+            message,
+            awaiting_confirmation=st.session_state.get('awaiting_confirmation', False),
+            early_conversation=len(chat_history) <= 2,
+            booking_in_progress=booking_in_progress
+        )
+
+    def handle_message(self, message: str, chat_history: List[Dict], stream: bool = False) -> Union[str, Iterator[str]]:
+        """
+        Route messages to correct handler.
+        With stream=True, replies that come from the LLM are returned as a token iterator.
+        """
         intent = self.detect_intent(message, chat_history)
+        
+        # Embedded once and shared by the intent embedding tier, the FAQ router and RAG
+        vector = None
+        if intent == 'question' or (intent is None and (self.intents.prototypes or self.router)):
+            vector = self.embeddings.embed_query(message)
+        if intent is None:
+            intent = self.intents.semantic_intent(vector, early_conversation=len(chat_history) <= 2)
 
         if intent == 'greeting':
             return self.handle_greeting(message)
@@ -68,10 +65,17 @@ class ChatLogic:
             return self.handle_booking_confirmation(False)
         elif intent == 'booking':
             return self.handle_booking(message, chat_history)
-        elif intent == 'question':
-            return self.handle_question(message, chat_history)
+        
+        # FAQ-style messages (hours, services, thanks) are answered without the LLM
+        if self.router:
+            local_answer = self.router.route(message, vector)
+            if local_answer:
+                return local_answer
+        
+        if intent == 'question':
+            return self.handle_question(message, chat_history, stream, vector)
         else:
-            return self.handle_general(message, chat_history)
+            return self.handle_general(message, chat_history, stream)
     
     def handle_greeting(self, message: str) -> str:
         """Handle greeting messages with appointment options"""
@@ -294,17 +298,14 @@ Return ONLY the JSON object, no other text.
 """
             
             try:
-                response = self.client.chat.completions.create(
-                    model=Config.GROQ_MODEL,
+                raw_response = self.complete(
                     messages=[
                         {"role": "system", "content": "You are a precise data extraction assistant. Return only valid JSON with null for missing values."},
                         {"role": "user", "content": extraction_prompt}
                     ],
                     temperature=0.1,
                     max_tokens=500
-                )
-                
-                raw_response = response.choices[0].message.content.strip()
+                ).strip()
                 st.success(f"✅ LLM responded ({len(raw_response)} chars)")
                 
                 st.write("\n**Step 4: LLM Raw Response:**")
@@ -429,52 +430,13 @@ Return ONLY the JSON object, no other text.
     def _regex_fallback_extraction(self, raw_text: str) -> Dict:
         """Fallback regex extraction"""
         st.info("🔄 Using regex-based extraction...")
-        extracted = {}
-        
-        # Email
-        email_match = re.search(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}', raw_text.replace(' ', ''))
-        if email_match:
-            extracted['email'] = email_match.group().lower()
-            st.success(f"✅ Email: {extracted['email']}")
-        
-        # Phone
-        phone_match = re.search(r'\d{10,}', raw_text)
-        if phone_match:
-            extracted['phone'] = phone_match.group()
-            st.success(f"✅ Phone: {extracted['phone']}")
-        
-        # Date
-        date_match = re.search(r'(\d{4})\s*[-/]\s*(\d{2})\s*[-/]\s*(\d{2})', raw_text)
-        if date_match:
-            # Remove any spaces from the matched date
-            date_str = f"{date_match.group(1)}-{date_match.group(2)}-{date_match.group(3)}"
-            extracted['date'] = date_str
-            st.success(f"✅ Date: {extracted['date']}")
-        
-        # Time
-        time_match = re.search(r'\b([0-2]?[0-9]):([0-5][0-9])\b', raw_text)
-        if time_match:
-            extracted['time'] = f"{int(time_match.group(1)):02d}:{time_match.group(2)}"
-            st.success(f"✅ Time: {extracted['time']}")
+        extracted = extract_from_document(raw_text)
         
-        # Booking Type
-        for booking_type in Config.BOOKING_TYPES:
-            if booking_type.lower() in raw_text.lower():
-                extracted['booking_type'] = booking_type
-                st.success(f"✅ Type: {booking_type}")
-                break
-        
-        # Name
-        lines = [line.strip() for line in raw_text.split('\n') if line.strip()]
-        for line in lines:
-            words = line.split()
-            if (1 <= len(words) <= 4 and 
-                line[0].isupper() and
-                all(w.replace('.', '').replace(',', '').isalpha() for w in words) and
-                '@' not in line and not any(c.isdigit() for c in line)):
-                extracted['name'] = line.title()
-                st.success(f"✅ Name: {extracted['name']}")
-                break
+        labels = {'email': 'Email', 'phone': 'Phone', 'date': 'Date', 'time': 'Time',
+                  'booking_type': 'Type', 'name': 'Name'}
+        for field, label in labels.items():
+            if field in extracted:
+                st.success(f"✅ {label}: {extracted[field]}")
         
         return extracted
 
@@ -493,11 +455,12 @@ Return ONLY the JSON object, no other text.
             return f"❌ {message}\n\nPlease try again or contact support."
 
         subject, body = self.tools.format_confirmation_email(st.session_state.booking_data, booking_id)
-        email_success, email_message = self.tools.send_email(st.session_state.booking_data['email'], subject, body)
+        # Delivered by the outbox worker - don't make the patient wait on SMTP
+        email_success, email_message = self.tools.queue_email(st.session_state.booking_data['email'], subject, body)
 
         response = f"✅ Booking confirmed! Your booking ID is #{booking_id}\n\n"
         if email_success:
-            response += "📧 A confirmation email has been sent.\n\n"
+            response += "📧 A confirmation email is on its way.\n\n"
         else:
             response += f"⚠️ Booking saved, but email failed to send.\n\n"
         
@@ -509,20 +472,22 @@ Return ONLY the JSON object, no other text.
         
         return response
 
-    def handle_question(self, message: str, chat_history: List[Dict]) -> str:
-        """Handle questions - check RAG first"""
+    def handle_question(self, message: str, chat_history: List[Dict], stream: bool = False,
+                        vector: List[float] = None) -> Union[str, Iterator[str]]:
+        """Handle questions - check RAG first (vector: the message embedding, if already computed)"""
         if self.tools.rag.is_ready():
-            rag_response = self.tools.rag_query(message, chat_history)
+            rag_response = self.tools.rag_query(message, chat_history, query_vector=vector)
             if "couldn't find" not in rag_response.lower():
                 return rag_response
-        return self.get_llm_response(message, chat_history)
+        return self.get_llm_response(message, chat_history, stream=stream)
 
-    def handle_general(self, message: str, chat_history: List[Dict]) -> str:
+    def handle_general(self, message: str, chat_history: List[Dict], stream: bool = False) -> Union[str, Iterator[str]]:
         """Handle general conversation"""
-        return self.get_llm_response(message, chat_history)
+        return self.get_llm_response(message, chat_history, stream=stream)
 
-    def get_llm_response(self, message: str, chat_history: List[Dict], system_prompt: str = None) -> str:
-        """Get response from Groq LLM"""
+    def get_llm_response(self, message: str, chat_history: List[Dict], system_prompt: str = None,
+                         stream: bool = False) -> Union[str, Iterator[str]]:
+        """Get response from Groq LLM, optionally as a stream of tokens"""
         try:
             messages = []
             if system_prompt:
@@ -530,19 +495,53 @@ Return ONLY the JSON object, no other text.
             else:
                 messages.append({"role": "system", "content": "You are a helpful medical appointment booking assistant."})
 
-            recent_history = chat_history[-20:]
-            for msg in recent_history:
-                messages.append({"role": msg["role"], "content": msg["content"]})
+            # The current message is already the last entry of chat_history
+            if chat_history and chat_history[-1]["role"] == "user" and chat_history[-1]["content"] == message:
+                chat_history = chat_history[:-1]
+            messages.extend(self.history.build(chat_history, st.session_state.history_summary))
 
             messages.append({"role": "user", "content": message})
 
-            response = self.client.chat.completions.create(
-                model=Config.GROQ_MODEL,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=500
-            )
-            return response.choices[0].message.content
+            if stream:
+                return self.stream_completion(messages, temperature=0.7, max_tokens=500)
+            return self.complete(messages, temperature=0.7, max_tokens=500)
+        except Exception as e:
+            st.error(f"LLM Error: {str(e)}")
+            return "I apologize, but I'm having trouble. Please try again."
+
+    def summarize_history(self, summary: str, messages: List[Dict]) -> str:
+        """Running conversation summary updated with messages that no longer fit the prompt"""
+        transcript = "\n".join(f"{m['role'].title()}: {m['content']}" for m in messages)
+        return self.complete(
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": f"Current summary:\n{summary or '(none)'}\n\nNew messages:\n{transcript}"}
+            ],
+            temperature=0.0,
+            max_tokens=Config.HISTORY_SUMMARY_MAX_TOKENS,
+            # Keyed on the whole transcript, so it would never hit - and would store the conversation
+            cache=False
+        )
+
+    def stream_completion(self, messages: List[Dict], temperature: float, max_tokens: int) -> Iterator[str]:
+        """Yield Groq completion tokens as they arrive"""
+        try:
+            yield from self.llm.stream(messages, temperature=temperature, max_tokens=max_tokens)
         except Exception as e:
             st.error(f"LLM Error: {str(e)}")
-            return "I apologize, but I'm having trouble. Please try again."
\ No newline at end of file
+            yield "I apologize, but I'm having trouble. Please try again."
+
+    def complete(self, messages: List[Dict], temperature: float, max_tokens: int, cache: bool = True) -> str:
+        """Groq chat completion, served from the response cache for low-temperature calls (unless cache=False)"""
+        if not cache:
+            return self.llm.complete(messages, temperature=temperature, max_tokens=max_tokens)
+
+        cached = self.llm_cache.get(Config.GROQ_MODEL, messages, temperature, max_tokens)
+        if cached is not None:
+            return cached
+
+        start = time.perf_counter()
+        content = self.llm.complete(messages, temperature=temperature, max_tokens=max_tokens)
+        self.llm_cache.put(Config.GROQ_MODEL, messages, temperature, max_tokens,
+                           content, time.perf_counter() - start)
+        return content
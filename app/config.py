@@ -19,12 +19,60 @@ class Config:
         EMAIL_SENDER = os.getenv("EMAIL_SENDER")
         EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
     
+    # Storage backend: "supabase" or "sqlite" (single node / offline)
+    DB_BACKEND = os.getenv("DB_BACKEND", "supabase")
+    SQLITE_DB_PATH = os.getenv("SQLITE_DB_PATH", "data/bookings.sqlite3")
+    DB_CACHE_TTL = 30  # Seconds a cached read may lag writes from other processes
+    DB_CACHE_MAX_ENTRIES = 256
+    
     # Model
     GROQ_MODEL = "llama-3.3-70b-versatile"
+    GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1")  # Any OpenAI-compatible API
+    LLM_MAX_CONCURRENCY = 8  # Requests in flight per process
+    LLM_TIMEOUT = 30.0  # Deadline per call, including queueing and retries
+    LLM_CONNECT_TIMEOUT = 5.0
+    LLM_MAX_RETRIES = 3  # On 429/5xx and connection errors
+    LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "0"))  # Seconds before a duplicate request; 0 = off
     
     # RAG Settings
+    EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
     CHUNK_SIZE = 1000
     CHUNK_OVERLAP = 200
+    VECTOR_STORE_DIR = os.getenv("VECTOR_STORE_DIR", "vector_store")
+    EMBED_BATCH_SIZE = 64  # Chunks per encoder call
+    PDF_WORKERS = os.cpu_count() or 1  # Processes for PDF text extraction
+    PDF_MIN_PAGES_PER_TASK = 4
+    STREAM_CHUNK_WINDOW = 10  # Chunk incoming pages once this many CHUNK_SIZEs are buffered
+    RAG_TOP_K = 5  # Chunks passed to the LLM
+    RAG_CANDIDATES = 20  # Candidates from each of FAISS and BM25 before rank fusion
+    RAG_TOMBSTONE_RATIO = 0.25  # Compact the index once this share of it is removed documents
+    SEMANTIC_CACHE_THRESHOLD = 0.92  # Cosine similarity needed to reuse a cached answer
+    SEMANTIC_CACHE_TTL = 3600  # Seconds
+    SEMANTIC_CACHE_MAX_ENTRIES = 512
+    
+    # LLM Response Cache (exact match, low-temperature calls only)
+    # "memory" or "sqlite". Cached prompts include PDF extraction requests, i.e. patient
+    # names, emails and phone numbers - "sqlite" keeps them on local disk for LLM_CACHE_TTL
+    LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory")
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "cache/llm_cache.sqlite3")
+    LLM_CACHE_MAX_ENTRIES = 1024
+    LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "86400"))  # Seconds; SQLite backend
+    LLM_CACHE_MAX_TEMPERATURE = 0.2
+    
+    # Email Delivery
+    SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+    SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+    SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") == "1"
+    SMTP_AUTH = os.getenv("SMTP_AUTH", "1") == "1"  # Set to 0 for a local test server
+    SMTP_TIMEOUT = 30
+    SMTP_POOL_SIZE = 2  # Concurrent sessions; keep low to stay under provider rate limits
+    SMTP_IDLE_TIMEOUT = 120  # Reconnect sessions idle longer than this (seconds)
+    OUTBOX_PATH = os.getenv("OUTBOX_PATH", "cache/outbox.sqlite3")
+    OUTBOX_MAX_ATTEMPTS = 6
+    OUTBOX_BACKOFF_SECONDS = 30  # Doubles after each failed attempt
+    OUTBOX_LEASE_SECONDS = 300  # A claimed email is retried after this if its worker died
+    OUTBOX_POLL_SECONDS = 5
+    OUTBOX_BATCH_SIZE = 20  # Emails sent per SMTP session
     
     # Booking Types
     BOOKING_TYPES = [
@@ -42,8 +90,43 @@ class Config:
         "end": "18:00"
     }
     
+    # Department schedules (from the clinic guide); weekday 0 = Monday.
+    # Slots run from start up to end, SLOT_MINUTES each.
+    DEPARTMENT_SCHEDULES = {
+        "General Consultation": {"days": [0, 1, 2, 3, 4, 5], "start": "09:00", "end": "18:00"},
+        "Pediatrics": {"days": [0, 1, 2, 3, 4], "start": "10:00", "end": "17:00"},
+        "Cardiology": {"days": [1, 3], "start": "14:00", "end": "18:00"},
+        "Dermatology": {"days": [2, 4], "start": "11:00", "end": "16:00"},
+        "Orthopedics": {"days": [0, 2, 4], "start": "13:00", "end": "17:00"},
+        "Dental": {"days": [0, 1, 2, 3, 4, 5], "start": "09:00", "end": "18:00"}
+    }
+    SLOT_MINUTES = 30
+    AVAILABILITY_REFRESH_SECONDS = 300  # Reload taken slots to see other processes' bookings
+    
+    # Admin Dashboard
+    ADMIN_PAGE_SIZES = [25, 50, 100, 250]
+    ADMIN_SEARCH_LIMIT = 50
+    ADMIN_SEARCH_MIN_CHARS = 3  # Shorter terms can't use the trigram index (booking ids excepted)
+    ADMIN_SEARCH_DEBOUNCE_MS = 300
+    EXPORT_PAGE_SIZE = 1000  # Rows fetched per query while exporting
+    EXPORT_SPOOL_BYTES = 8 * 1024 * 1024  # Exports larger than this are spooled to disk
+    EXPORT_MAX_BYTES = 100 * 1024 * 1024  # Largest export offered for download (held in memory by Streamlit)
+    
+    # Intent Detection
+    INTENT_EMBEDDINGS = os.getenv("INTENT_EMBEDDINGS", "1") == "1"  # Embedding tier for messages with no keyword cue
+    INTENT_EMBEDDING_THRESHOLD = 0.55  # Cosine similarity to the closest prototype
+    
+    # Local Router (FAQ answers without the LLM)
+    LOCAL_ROUTER = os.getenv("LOCAL_ROUTER", "1") == "1"
+    ROUTER_THRESHOLD = 0.75  # Cosine similarity to the closest example; stricter than intent detection
+    ROUTER_MAX_WORDS = 12  # Longer messages always go to the LLM
+    
     # Memory Settings
     MAX_MEMORY_MESSAGES = 20
+    HISTORY_TOKEN_BUDGET = 1500  # Prompt tokens for chat history (summary + recent turns)
+    HISTORY_KEEP_RATIO = 0.5  # After summarizing, recent turns use at most this share of the budget
+    HISTORY_SUMMARY_MAX_TOKENS = 200
+    RAG_CONDENSE_MAX_WORDS = 8  # Longer questions are never treated as follow-ups of the previous one
     
     @staticmethod
     def validate():
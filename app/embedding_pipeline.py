@@ -0,0 +1,108 @@
+import time
+from concurrent.futures import Executor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from app.config import Config
+from app.pdf_extraction import iter_pages, submit_pages
+
+
+class EmbeddingPipeline:
+    """
+    Extract PDFs in a process pool and embed their chunks in batches.
+
+    Page ranges of every PDF are submitted to the pool up front, so a single
+    large upload keeps all cores busy. Pages are consumed in order as their
+    range finishes, chunked incrementally and encoded batch by batch on the
+    main thread while the pool keeps extracting later pages.
+    """
+
+    def __init__(self, embeddings, text_splitter, pool: Executor,
+                 batch_size: int = None, workers: int = None):
+        self.embeddings = embeddings
+        self.text_splitter = text_splitter
+        self.pool = pool
+        self.batch_size = batch_size or Config.EMBED_BATCH_SIZE
+        self.workers = workers or Config.PDF_WORKERS
+        self.stats = {"documents": 0, "pages": 0, "chunks": 0, "embed_seconds": 0.0, "total_seconds": 0.0}
+
+    def run(self, jobs: List[Tuple[str, str, bytes]],
+            progress: Optional[Callable[[Dict], None]] = None) -> Iterator[Dict]:
+        """
+        Process (doc_id, name, pdf_bytes) jobs.
+        Yields: {"doc_id", "name", "text", "chunks", "vectors"} per document
+        """
+        started = time.perf_counter()
+
+        try:
+            submitted = [
+                (doc_id, name, submit_pages(self.pool, data, self.workers, Config.PDF_MIN_PAGES_PER_TASK))
+                for doc_id, name, data in jobs
+            ]
+
+            for doc_id, name, futures in submitted:
+                parts = []
+                chunks = []
+                vectors = []
+                for chunk in self._iter_chunks(iter_pages(futures), parts):
+                    chunks.append(chunk)
+                    if len(chunks) - len(vectors) >= self.batch_size:
+                        vectors.extend(self.embed(chunks[len(vectors):], progress))
+                vectors.extend(self.embed(chunks[len(vectors):], progress))
+                self.stats["documents"] += 1
+
+                yield {"doc_id": doc_id, "name": name, "text": "".join(parts), "chunks": chunks, "vectors": vectors}
+        finally:
+            self.stats["total_seconds"] += time.perf_counter() - started
+
+    def _iter_chunks(self, pages: Iterator[str], parts: List[str]) -> Iterator[str]:
+        """
+        Chunk pages as they arrive instead of waiting for the whole document.
+        Page text is collected into parts for a single linear join afterwards.
+        """
+        window = Config.CHUNK_SIZE * Config.STREAM_CHUNK_WINDOW
+        buffer = []
+        buffered = 0
+
+        for page_text in pages:
+            self.stats["pages"] += 1
+            if not page_text:
+                continue
+
+            piece = page_text + "\n"
+            parts.append(piece)
+            buffer.append(piece)
+            buffered += len(piece)
+
+            if buffered >= window:
+                text = "".join(buffer)
+                chunks = self.text_splitter.split_text(text)
+                if len(chunks) > 1:
+                    # The last chunk may continue on the next page - carry it over
+                    yield from chunks[:-1]
+                    text = text[text.rfind(chunks[-1]):]
+                buffer = [text]
+                buffered = len(text)
+
+        text = "".join(buffer)
+        if text.strip():
+            yield from self.text_splitter.split_text(text)
+
+    def embed(self, chunks: List[str], progress: Optional[Callable[[Dict], None]] = None) -> List[List[float]]:
+        """Encode chunks in batches of batch_size"""
+        vectors = []
+        for i in range(0, len(chunks), self.batch_size):
+            batch = chunks[i:i + self.batch_size]
+            batch_start = time.perf_counter()
+            vectors.extend(self.embeddings.embed_documents(batch))
+            self.stats["embed_seconds"] += time.perf_counter() - batch_start
+            self.stats["chunks"] += len(batch)
+            if progress:
+                progress(self.throughput())
+        return vectors
+
+    def throughput(self) -> Dict:
+        """Current stats plus chunks/sec over encode time"""
+        stats = dict(self.stats)
+        stats["chunks_per_sec"] = (
+            stats["chunks"] / stats["embed_seconds"] if stats["embed_seconds"] else 0.0
+        )
+        return stats
@@ -0,0 +1,83 @@
+import csv
+from tempfile import SpooledTemporaryFile
+from typing import Dict, Iterable, List
+from app.config import Config
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+
+COLUMNS = ["ID", "Name", "Email", "Phone", "Type", "Date", "Time", "Status", "Created"]
+
+
+def parquet_available() -> bool:
+    return pa is not None
+
+
+def flatten(booking: Dict) -> List:
+    """Booking dict (with nested customers) -> row in COLUMNS order"""
+    customer = booking.get('customers') or {}
+    return [
+        booking.get('id'),
+        customer.get('name'),
+        customer.get('email'),
+        customer.get('phone'),
+        booking.get('booking_type'),
+        str(booking.get('date') or ''),
+        str(booking.get('time') or ''),
+        (booking.get('status') or '').upper(),
+        str(booking.get('created_at') or ''),
+    ]
+
+
+def export_csv(pages: Iterable[List[Dict]]) -> SpooledTemporaryFile:
+    """
+    Write pages of bookings to a CSV file, one page at a time.
+    While writing, memory stays at one page plus the spool buffer; larger
+    exports spill to disk. Serving the file is another matter:
+    st.download_button only accepts the whole payload in memory (see
+    AdminDashboard.render_export, which caps it at EXPORT_MAX_BYTES).
+    Returns the (text mode) file rewound to the start.
+    """
+    # Text mode on the spool itself: wrapping a binary SpooledTemporaryFile in
+    # io.TextIOWrapper needs readable()/seekable(), which only exist from Python 3.11
+    out = SpooledTemporaryFile(max_size=Config.EXPORT_SPOOL_BYTES, mode="w+", newline="", encoding="utf-8")
+    writer = csv.writer(out)
+    writer.writerow(COLUMNS)
+    for page in pages:
+        writer.writerows(flatten(booking) for booking in page)
+    out.seek(0)
+    return out
+
+
+def export_parquet(pages: Iterable[List[Dict]]) -> SpooledTemporaryFile:
+    """Write pages of bookings to a Parquet file, one row group per page"""
+    if pa is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+
+    schema = pa.schema([
+        ("ID", pa.int64()),
+        ("Name", pa.string()),
+        ("Email", pa.string()),
+        ("Phone", pa.string()),
+        ("Type", pa.dictionary(pa.int8(), pa.string())),
+        ("Date", pa.string()),
+        ("Time", pa.string()),
+        ("Status", pa.dictionary(pa.int8(), pa.string())),
+        ("Created", pa.string()),
+    ])
+
+    out = SpooledTemporaryFile(max_size=Config.EXPORT_SPOOL_BYTES)
+    with pq.ParquetWriter(out, schema, compression="zstd") as writer:
+        for page in pages:
+            if not page:
+                continue
+            columns = list(zip(*(flatten(booking) for booking in page)))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+    out.seek(0)
+    return out
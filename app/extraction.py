@@ -0,0 +1,143 @@
+"""
+Regex field extraction shared by the chat flow (BookingFlow.extract_info) and
+the PDF fallback (ChatLogic._regex_fallback_extraction).
+
+Every pattern is compiled once at import; booking types and the name
+exclusion keywords are each folded into a single alternation, so a message
+is scanned once per field instead of once per keyword.
+"""
+import re
+from datetime import date
+from typing import Dict, Optional
+from app.config import Config
+
+# Chat messages
+EMAIL = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE = re.compile(r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+PHONE_STRIP = re.compile(r'[^\d+]')
+# YYYY-MM-DD or DD-MM-YYYY, '-' or '/' (the same separator on both sides)
+DATE = re.compile(r'\b(?:(\d{4})([-/])(\d{2})\2(\d{2})|(\d{2})([-/])(\d{2})\6(\d{4}))\b')
+TIME = re.compile(r'\b([0-1]?[0-9]|2[0-3]):([0-5][0-9])\b')
+NAME_IS = re.compile(r'name is (.+?)(?:\.|$)', re.IGNORECASE)
+I_AM = re.compile(r"(?:i'm|i am) (.+?)(?:\.|$)", re.IGNORECASE)
+
+# Documents (PDF text)
+DOC_EMAIL = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}')
+DOC_PHONE = re.compile(r'\d{10,}')
+DOC_DATE = re.compile(r'(\d{4})\s*[-/]\s*(\d{2})\s*[-/]\s*(\d{2})')
+DOC_TIME = re.compile(r'\b([0-2]?[0-9]):([0-5][0-9])\b')
+
+# Booking types match as case-insensitive substrings; the first in BOOKING_TYPES order wins
+BOOKING_TYPE_RANK = {t.lower(): i for i, t in enumerate(Config.BOOKING_TYPES)}
+BOOKING_TYPE = re.compile(
+    "|".join(re.escape(t) for t in sorted(BOOKING_TYPE_RANK, key=len, reverse=True))
+)
+
+# A short capitalised message is taken as a name unless it contains one of these
+NAME_EXCLUSIONS = re.compile("|".join(re.escape(k) for k in sorted(
+    {'book', 'appointment', 'email', '@', 'phone', 'time', 'date', ':', 'http'}
+    | set(BOOKING_TYPE_RANK)
+    | {word for t in BOOKING_TYPE_RANK for word in t.split()},
+    key=len, reverse=True
+)))
+
+
+def _booking_type(text_lower: str) -> Optional[str]:
+    found = {m.group() for m in BOOKING_TYPE.finditer(text_lower)}
+    if not found:
+        return None
+    return Config.BOOKING_TYPES[min(BOOKING_TYPE_RANK[t] for t in found)]
+
+
+def _date(text: str) -> Optional[str]:
+    """First valid date in the message, as YYYY-MM-DD"""
+    for m in DATE.finditer(text):
+        if m.group(1):
+            year, month, day = m.group(1), m.group(3), m.group(4)
+        else:
+            day, month, year = m.group(5), m.group(7), m.group(8)
+        try:
+            return date(int(year), int(month), int(day)).isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def extract_from_message(user_message: str) -> Dict:
+    """Booking fields found in a chat message"""
+    extracted = {}
+
+    email_match = EMAIL.search(user_message)
+    if email_match:
+        extracted["email"] = email_match.group()
+
+    phone_match = PHONE.search(user_message)
+    if phone_match:
+        extracted["phone"] = PHONE_STRIP.sub('', phone_match.group())
+
+    booking_date = _date(user_message)
+    if booking_date:
+        extracted["date"] = booking_date
+
+    time_match = TIME.search(user_message)
+    if time_match:
+        extracted["time"] = f"{int(time_match.group(1)):02d}:{time_match.group(2)}"
+
+    # Booking type FIRST (before name) to avoid conflicts
+    message_lower = user_message.lower()
+    booking_type = _booking_type(message_lower)
+    if booking_type:
+        extracted["booking_type"] = booking_type
+
+    if "name is" in message_lower:
+        name_match = NAME_IS.search(user_message)
+        if name_match:
+            extracted["name"] = name_match.group(1).strip().title()
+    elif "i'm" in message_lower or "i am" in message_lower:
+        name_match = I_AM.search(user_message)
+        if name_match:
+            extracted["name"] = name_match.group(1).strip().title()
+    else:
+        # A bare name, e.g. in reply to "What's your name?": 1-4 words, capitalised,
+        # and nothing that looks like another field or a department ("Dental")
+        words = user_message.strip().split()
+        if 1 <= len(words) <= 4 and words[0][0].isupper() and not NAME_EXCLUSIONS.search(message_lower):
+            extracted["name"] = user_message.strip().title()
+
+    return extracted
+
+
+def extract_from_document(raw_text: str) -> Dict:
+    """Booking fields found in text extracted from a PDF form"""
+    extracted = {}
+
+    email_match = DOC_EMAIL.search(raw_text.replace(' ', ''))
+    if email_match:
+        extracted['email'] = email_match.group().lower()
+
+    phone_match = DOC_PHONE.search(raw_text)
+    if phone_match:
+        extracted['phone'] = phone_match.group()
+
+    date_match = DOC_DATE.search(raw_text)
+    if date_match:
+        extracted['date'] = f"{date_match.group(1)}-{date_match.group(2)}-{date_match.group(3)}"
+
+    time_match = DOC_TIME.search(raw_text)
+    if time_match:
+        extracted['time'] = f"{int(time_match.group(1)):02d}:{time_match.group(2)}"
+
+    booking_type = _booking_type(raw_text.lower())
+    if booking_type:
+        extracted['booking_type'] = booking_type
+
+    # Name: first short, capitalised line made of letters only (so no '@' or digits)
+    for line in raw_text.split('\n'):
+        line = line.strip()
+        words = line.split()
+        if 1 <= len(words) <= 4 and line[0].isupper() and all(
+                w.replace('.', '').replace(',', '').isalpha() for w in words):
+            extracted['name'] = line.title()
+            break
+
+    return extracted
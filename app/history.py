@@ -0,0 +1,134 @@
+"""
+Token-aware chat history for LLM prompts.
+
+Token counts are computed once per message and cached in the message dict
+itself (st.session_state.messages holds plain dicts), so each turn only
+counts the new message. When the history no longer fits the prompt budget,
+the oldest turns are folded into a running summary with one LLM call and
+marked as summarized; the summary replaces them in later prompts.
+"""
+import re
+from typing import Callable, Dict, List, Optional
+from app.config import Config
+
+try:
+    # Optional: exact BPE counts. Llama's tokenizer isn't shipped with tiktoken,
+    # but cl100k_base is close enough for budgeting.
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+MESSAGE_OVERHEAD = 4  # Role and separator tokens per chat message
+
+# A follow-up leans on the previous question: "and on Saturday?", "what about
+# dental?", "is it covered?". Not "there" - "Is there parking?" stands alone.
+FOLLOW_UP_LEAD = re.compile(r"^\s*(?:and|also|then|what about|how about|what if|same for)\b", re.IGNORECASE)
+FOLLOW_UP_PRONOUN = re.compile(r"\b(?:it|its|that|this|they|them|those|these)\b", re.IGNORECASE)
+QUESTION_CUE = re.compile(r"\?|^\s*(?:what|how|when|where|who|why|which|is|are|do|does|can|could)\b", re.IGNORECASE)
+
+SUMMARY_PROMPT = (
+    "You keep a short running summary of a conversation between a patient and a medical "
+    "appointment booking assistant. Keep names, departments, dates, times and any open "
+    "questions. Reply with the updated summary only."
+)
+
+
+def count_tokens(text: str) -> int:
+    """Token count of text (tiktoken if installed, else ~4 characters per token)"""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def message_tokens(message: Dict) -> int:
+    """Tokens of one chat message, cached in the message under "tokens" """
+    tokens = message.get("tokens")
+    if tokens is None:
+        tokens = message["tokens"] = count_tokens(message["content"]) + MESSAGE_OVERHEAD
+    return tokens
+
+
+def is_follow_up(question: str) -> bool:
+    """Short question that only makes sense with the previous one"""
+    if len(question.split()) > Config.RAG_CONDENSE_MAX_WORDS:
+        return False
+    return bool(FOLLOW_UP_LEAD.search(question) or FOLLOW_UP_PRONOUN.search(question))
+
+
+def previous_question(question: str, chat_history: List[Dict]) -> Optional[str]:
+    """The latest earlier user message that was itself a question (not a name, email or "hi")"""
+    for message in reversed(chat_history):
+        if message["role"] == "user" and message["content"] != question and QUESTION_CUE.search(message["content"]):
+            return message["content"]
+    return None
+
+
+def condense_question(question: str, chat_history: List[Dict] = None) -> str:
+    """
+    Retrieval query for a question: the question alone, or - for a follow-up
+    like "and on Saturday?" - the previous question followed by this one,
+    never the whole transcript. Standalone questions keep their exact text,
+    so the semantic answer cache keys on them.
+    """
+    if not chat_history or not is_follow_up(question):
+        return question
+
+    earlier = previous_question(question, chat_history)
+    return f"{earlier} {question}" if earlier else question
+
+
+class HistoryBudget:
+    """
+    Builds the history part of a prompt within HISTORY_TOKEN_BUDGET tokens.
+
+    `state` is a dict kept across turns (a key in st.session_state, reset with
+    the chat) holding the running summary; `summarize(summary, messages)` returns the summary updated
+    with the given messages. When the budget is exceeded, enough old turns are
+    summarized to bring the recent ones down to HISTORY_KEEP_RATIO of the
+    budget, so the summary is updated every few turns rather than every turn.
+    """
+
+    def __init__(self, summarize: Callable[[str, List[Dict]], str], budget: int = None,
+                 keep_ratio: float = None):
+        self.summarize = summarize
+        self.budget = budget or Config.HISTORY_TOKEN_BUDGET
+        self.keep_ratio = keep_ratio or Config.HISTORY_KEEP_RATIO
+
+    def build(self, chat_history: List[Dict], state: Dict) -> List[Dict]:
+        """Role/content messages to send: the summary (if any) and the recent turns"""
+        summary = state.get("summary", "")
+
+        recent = [m for m in chat_history if not m.get("summarized")]
+        used = count_tokens(summary) if summary else 0
+        if used + sum(message_tokens(m) for m in recent) > self.budget:
+            summary, recent = self._fold(summary, recent)
+            state["summary"] = summary
+
+        messages = []
+        if summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"})
+        messages.extend({"role": m["role"], "content": m["content"]} for m in recent)
+        return messages
+
+    def _fold(self, summary: str, recent: List[Dict]):
+        """Summarize the oldest of `recent` until the rest fits the keep target"""
+        target = int(self.budget * self.keep_ratio)
+        kept, used = 0, 0
+        for message in reversed(recent):
+            if used + message_tokens(message) > target and kept:
+                break
+            used += message_tokens(message)
+            kept += 1
+        old, recent = recent[:-kept], recent[-kept:]
+        if not old:
+            return summary, recent
+
+        try:
+            summary = (self.summarize(summary, old) or "").strip()
+        except Exception:
+            # Leave the old turns out of this prompt only; a later turn retries the summary
+            return summary, recent
+        for message in old:
+            message["summarized"] = True
+        return summary, recent
@@ -0,0 +1,51 @@
+from typing import List, Optional
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.pydantic_v1 import Field
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStore
+from app.bm25 import BM25Index, reciprocal_rank_fusion
+
+
+def chunk_id(doc: Document) -> str:
+    """Id of an indexed chunk, as assigned by RAGPipeline"""
+    return f"{doc.metadata['doc_id']}:{doc.metadata['chunk']}"
+
+
+class HybridRetriever(BaseRetriever):
+    """Dense (FAISS) + lexical (BM25) retrieval fused by reciprocal rank"""
+
+    vectorstore: VectorStore
+    bm25: BM25Index
+    k: int = 5
+    candidates: int = 20
+    """Results taken from each retriever before fusion"""
+    search_kwargs: dict = Field(default_factory=dict)
+    """Extra FAISS search arguments (tombstone filter)"""
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self.retrieve(query)
+
+    def retrieve(self, query: str, query_vector: Optional[List[float]] = None) -> List[Document]:
+        """Top-k fused documents. Pass query_vector to reuse an embedding already computed"""
+        search_kwargs = dict(self.search_kwargs)
+        search_kwargs["fetch_k"] = search_kwargs.get("fetch_k", 0) + self.candidates
+
+        if query_vector is None:
+            vector_docs = self.vectorstore.similarity_search(query, k=self.candidates, **search_kwargs)
+        else:
+            vector_docs = self.vectorstore.similarity_search_by_vector(query_vector, k=self.candidates, **search_kwargs)
+
+        docs = {chunk_id(doc): doc for doc in vector_docs}
+        keyword_ids = [cid for cid, _ in self.bm25.search(query, self.candidates)]
+
+        fused = reciprocal_rank_fusion([list(docs), keyword_ids])
+
+        results = []
+        for cid, _ in fused[:self.k]:
+            doc = docs.get(cid) or self.vectorstore.docstore.search(cid)
+            if isinstance(doc, Document):
+                results.append(doc)
+        return results
@@ -0,0 +1,95 @@
+import re
+from typing import Dict, List, Optional, Set
+from app.config import Config
+from app.prototypes import PrototypeMatcher
+
+# Keyword cues per intent, as regex fragments matched on word boundaries
+# (so "hi" no longer fires inside "this"). Stems take an optional suffix.
+INTENT_KEYWORDS: Dict[str, List[str]] = {
+    "confirm_yes": ["yes", r"confirm\w*", "correct", "right", "yep", "yeah"],
+    "confirm_no": ["no", r"cancel\w*", "wrong", "nope"],
+    "greeting": ["hi", "hello", "hey", r"good\s+(?:morning|afternoon|evening)", "greetings"],
+    "booking": [r"book\w*", r"appointments?", r"schedul\w*", r"reserv\w*", r"need\w*",
+                r"want\s+to\s+see", r"visit\w*", r"consultations?"],
+    "question": ["what", "how", "when", "where", "who", "why", r"tell\s+me", r"explain\w*"],
+}
+
+# Example messages for the embedding tier, used when no keyword matches
+INTENT_PROTOTYPES: Dict[str, List[str]] = {
+    "booking": [
+        "I'd like to see a doctor",
+        "Can I come in on Friday morning?",
+        "Please get me in with a cardiologist",
+        "My child needs a checkup",
+        "I have a toothache and want it looked at",
+    ],
+    "question": [
+        "Do you accept my insurance?",
+        "Is there parking at the clinic?",
+        "Are you open on Sundays?",
+        "Which doctors work on Saturday?",
+        "Do I need to bring anything to my visit?",
+    ],
+    "greeting": [
+        "Hello there",
+        "Good day to you",
+        "Hiya, anyone there?",
+    ],
+}
+
+
+class IntentClassifier:
+    """
+    Two-tier intent detection, both cheaper than an LLM call:
+    1. all keyword sets compiled into one word-boundary regex (one scan per message);
+    2. optionally, for messages with no keyword cue, the closest of
+       INTENT_PROTOTYPES to the message embedding (computed once by the caller).
+    """
+
+    def __init__(self, embeddings=None, threshold: float = None):
+        self.prototypes = None
+        if embeddings is not None:
+            self.prototypes = PrototypeMatcher(
+                embeddings, INTENT_PROTOTYPES,
+                threshold if threshold is not None else Config.INTENT_EMBEDDING_THRESHOLD
+            )
+        # One named group per intent; lastgroup tells which intent a match belongs to
+        self.pattern = re.compile(
+            "|".join(
+                rf"(?P<{intent}>\b(?:{'|'.join(fragments)})\b)"
+                for intent, fragments in INTENT_KEYWORDS.items()
+            ),
+            re.IGNORECASE
+        )
+
+    def keywords(self, message: str) -> Set[str]:
+        """Intents with at least one keyword in the message"""
+        return {m.lastgroup for m in self.pattern.finditer(message)}
+
+    def keyword_intent(self, message: str, awaiting_confirmation: bool = False,
+                       early_conversation: bool = False, booking_in_progress: bool = False) -> Optional[str]:
+        """confirm_yes, confirm_no, greeting, booking or question - None if there is no cue"""
+        found = self.keywords(message)
+
+        if awaiting_confirmation:
+            if "confirm_yes" in found:
+                return "confirm_yes"
+            if "confirm_no" in found:
+                return "confirm_no"
+
+        if early_conversation and "greeting" in found:
+            return "greeting"
+        if "booking" in found or booking_in_progress:
+            return "booking"
+        if "question" in found:
+            return "question"
+        return None
+
+    def semantic_intent(self, vector, early_conversation: bool = False) -> str:
+        """Intent of a message with no keyword cue, from its embedding ('general' if unsure)"""
+        if self.prototypes is None or vector is None:
+            return "general"
+        intent = self.prototypes.match(vector)
+        if intent == "greeting" and not early_conversation:
+            return "general"
+        return intent or "general"
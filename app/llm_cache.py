@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from app.config import Config
+
+
+class MemoryCacheBackend:
+    """In-process LRU store"""
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or Config.LLM_CACHE_MAX_ENTRIES
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict) -> None:
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+class SQLiteCacheBackend:
+    """
+    On-disk store shared by every worker process on the host.
+    Rows expire after ttl seconds and at most max_entries are kept (oldest
+    written are evicted first), so cached prompts - which can carry patient
+    details - don't accumulate on disk.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = None, ttl: float = None):
+        self.path = path or Config.LLM_CACHE_PATH
+        self.max_entries = max_entries or Config.LLM_CACHE_MAX_ENTRIES
+        self.ttl = ttl or Config.LLM_CACHE_TTL
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                latency REAL NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_created_at ON llm_cache(created_at)")
+        conn.commit()
+        self._prune(conn)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread - sqlite3 connections aren't shareable across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Dict]:
+        row = self._conn().execute(
+            "SELECT content, latency FROM llm_cache WHERE key = ? AND created_at >= ?",
+            (key, time.time() - self.ttl)
+        ).fetchone()
+        return {"content": row[0], "latency": row[1]} if row else None
+
+    def set(self, key: str, value: Dict) -> None:
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, content, latency, created_at) VALUES (?, ?, ?, ?)",
+            (key, value["content"], value["latency"], time.time())
+        )
+        conn.commit()
+        self._prune(conn)
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        """Delete expired rows and everything beyond the newest max_entries"""
+        conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl,))
+        conn.execute("""
+            DELETE FROM llm_cache WHERE key IN (
+                SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+        conn.commit()
+
+
+class LLMResponseCache:
+    """
+    Exact-match cache of chat completions, keyed on (model, messages, temperature, max_tokens).
+    Only low-temperature calls are cached - their output is effectively deterministic.
+    """
+
+    def __init__(self, backend=None, max_temperature: float = None):
+        self.backend = backend or MemoryCacheBackend()
+        self.max_temperature = (
+            max_temperature if max_temperature is not None else Config.LLM_CACHE_MAX_TEMPERATURE
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.latency_saved = 0.0
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict], temperature: float, max_tokens: int) -> str:
+        payload = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def cacheable(self, temperature: float) -> bool:
+        return temperature <= self.max_temperature
+
+    def get(self, model: str, messages: List[Dict], temperature: float, max_tokens: int) -> Optional[str]:
+        """Cached response text, or None"""
+        if not self.cacheable(temperature):
+            return None
+
+        try:
+            value = self.backend.get(self.make_key(model, messages, temperature, max_tokens))
+        except sqlite3.Error:
+            value = None
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.bytes_saved += len(value["content"].encode("utf-8"))
+            self.latency_saved += value["latency"]
+        return value["content"]
+
+    def put(self, model: str, messages: List[Dict], temperature: float, max_tokens: int,
+            content: str, latency: float) -> None:
+        """Store a response along with how long it took to produce"""
+        if not self.cacheable(temperature):
+            return
+        try:
+            self.backend.set(
+                self.make_key(model, messages, temperature, max_tokens),
+                {"content": content, "latency": latency}
+            )
+        except sqlite3.Error:
+            # A cache write failure must never fail the request
+            pass
+
+    def stats(self) -> Dict:
+        """Hit/miss counters, response bytes and seconds of LLM latency avoided"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "bytes_saved": self.bytes_saved,
+                "latency_saved": self.latency_saved,
+            }
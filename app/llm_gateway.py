@@ -0,0 +1,309 @@
+import asyncio
+import json
+import queue
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, List, Optional
+import httpx
+from app.config import Config
+from app.metrics import percentile
+
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.25  # Seconds; doubles per attempt
+BACKOFF_CAP = 4.0
+_DONE = object()
+
+
+class LLMGatewayError(Exception):
+    """A completion failed after its retries, or ran past its deadline"""
+
+
+def _retry_after(response: Optional[httpx.Response]) -> Optional[float]:
+    try:
+        return float(response.headers["retry-after"])
+    except (AttributeError, KeyError, ValueError):
+        return None
+
+
+class LLMGateway:
+    """
+    Client for an OpenAI-compatible chat completions API (Groq by default).
+
+    Requests run on one asyncio event loop in a background thread, over a
+    shared httpx.AsyncClient (HTTP/2 when h2 is installed, so concurrent calls
+    share a connection). The blocking `complete`/`stream` methods hand the call
+    to that loop and wait, so Streamlit script threads can use it as before;
+    `acomplete` is the same call for async code.
+
+    Every call has a deadline (LLM_TIMEOUT) covering queueing, retries and the
+    response; at most LLM_MAX_CONCURRENCY requests are in flight per process.
+    429/5xx and transport errors are retried with jittered exponential backoff
+    (or the server's Retry-After). With LLM_HEDGE_AFTER set, a call that has
+    not answered by then is sent a second time and the first answer wins.
+    """
+
+    def __init__(self, base_url: str = None, api_key: str = None, max_concurrency: int = None,
+                 timeout: float = None, max_retries: int = None, hedge_after: float = None):
+        self.base_url = (base_url or Config.GROQ_BASE_URL).rstrip("/")
+        self.api_key = api_key if api_key is not None else Config.GROQ_API_KEY
+        self.max_concurrency = max_concurrency or Config.LLM_MAX_CONCURRENCY
+        self.timeout = timeout or Config.LLM_TIMEOUT
+        self.max_retries = max_retries if max_retries is not None else Config.LLM_MAX_RETRIES
+        self.hedge_after = hedge_after if hedge_after is not None else Config.LLM_HEDGE_AFTER
+
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failed = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.latencies = deque(maxlen=1000)  # Seconds, successful calls only
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-gateway", daemon=True)
+        self._thread.start()
+        self._run(self._open())
+
+    # Event loop plumbing
+
+    def _run(self, coro):
+        """Run a coroutine on the gateway loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _open(self) -> None:
+        # Created on the gateway loop, which they are bound to
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            http2=_HTTP2,
+            timeout=httpx.Timeout(self.timeout, connect=Config.LLM_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=self.max_concurrency,
+                                max_keepalive_connections=self.max_concurrency)
+        )
+
+    def close(self) -> None:
+        """Close the connection pool and stop the loop thread"""
+        self._run(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    # Requests
+
+    def _payload(self, messages: List[Dict], model: str, temperature: float, max_tokens: int,
+                 stream: bool = False) -> Dict:
+        payload = {
+            "model": model or Config.GROQ_MODEL,
+            "messages": messages,
+            "temperature": temperature,
+        }
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def _backoff(self, attempt: int, response: httpx.Response = None) -> float:
+        retry_after = _retry_after(response)
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))  # Full jitter
+
+    async def _post(self, payload: Dict, deadline: float) -> Dict:
+        """POST /chat/completions, retrying 429/5xx and transport errors until the deadline"""
+        error = None
+        for attempt in range(self.max_retries + 1):
+            response = None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                # Waiting for a slot counts against the deadline too
+                response = await asyncio.wait_for(self._send(payload), remaining)
+            except asyncio.TimeoutError:
+                raise LLMGatewayError("LLM call exceeded its deadline")
+            except httpx.TransportError as e:
+                error = e
+            else:
+                if response.status_code not in RETRY_STATUS:
+                    if response.is_error:
+                        raise LLMGatewayError(f"LLM API error {response.status_code}: {response.text[:200]}")
+                    return response.json()
+                error = LLMGatewayError(f"LLM API error {response.status_code}")
+
+            if attempt == self.max_retries:
+                break
+            delay = self._backoff(attempt, response)
+            if time.monotonic() + delay >= deadline:
+                break
+            with self._lock:
+                self.retries += 1
+            await asyncio.sleep(delay)
+
+        raise LLMGatewayError(f"LLM call failed after {attempt + 1} attempt(s): {error or 'deadline exceeded'}")
+
+    async def _send(self, payload: Dict) -> httpx.Response:
+        async with self._semaphore:
+            return await self._client.post("/chat/completions", json=payload)
+
+    async def _hedged(self, payload: Dict, deadline: float) -> Dict:
+        """_post, plus a second identical request if the first is slower than hedge_after"""
+        primary = asyncio.ensure_future(self._post(payload, deadline))
+        if not self.hedge_after:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_after)
+        if done:
+            return primary.result()
+
+        with self._lock:
+            self.hedges += 1
+        hedge = asyncio.ensure_future(self._post(payload, deadline))
+        pending, error = {primary, hedge}, None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            with self._lock:
+                                self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _complete(self, payload: Dict, timeout: float = None) -> str:
+        start = time.monotonic()
+        with self._lock:
+            self.calls += 1
+        try:
+            body = await self._hedged(payload, start + (timeout or self.timeout))
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        with self._lock:
+            self.latencies.append(time.monotonic() - start)
+        return body["choices"][0]["message"]["content"]
+
+    def complete(self, messages: List[Dict], model: str = None, temperature: float = 0.7,
+                 max_tokens: int = 500, timeout: float = None) -> str:
+        """Chat completion text (blocks the calling thread, not the gateway)"""
+        return self._run(self._complete(self._payload(messages, model, temperature, max_tokens), timeout))
+
+    async def acomplete(self, messages: List[Dict], model: str = None, temperature: float = 0.7,
+                        max_tokens: int = 500, timeout: float = None) -> str:
+        """complete() for async callers on any event loop"""
+        future = asyncio.run_coroutine_threadsafe(
+            self._complete(self._payload(messages, model, temperature, max_tokens), timeout), self._loop
+        )
+        return await asyncio.wrap_future(future)
+
+    # Streaming
+
+    async def _stream(self, payload: Dict, deadline: float, out: queue.Queue) -> None:
+        """Put streamed tokens on `out`, then _DONE; errors are put on `out` too"""
+        started = False
+        try:
+            for attempt in range(self.max_retries + 1):
+                response = None
+                try:
+                    async with self._semaphore:
+                        async with self._client.stream("POST", "/chat/completions", json=payload) as response:
+                            if response.status_code not in RETRY_STATUS:
+                                if response.is_error:
+                                    await response.aread()
+                                    raise LLMGatewayError(
+                                        f"LLM API error {response.status_code}: {response.text[:200]}"
+                                    )
+                                async for line in response.aiter_lines():
+                                    # Server-sent events: "data: {chunk}" lines, then "data: [DONE]"
+                                    if not line.startswith("data:"):
+                                        continue
+                                    data = line[5:].strip()
+                                    if data == "[DONE]":
+                                        break
+                                    choices = json.loads(data).get("choices")
+                                    token = choices[0].get("delta", {}).get("content") if choices else None
+                                    if token:
+                                        started = True
+                                        out.put(token)
+                                return
+                            error = LLMGatewayError(f"LLM API error {response.status_code}")
+                except httpx.TransportError as e:
+                    if started:
+                        raise
+                    response, error = None, e
+
+                # Retried only before the first token, so nothing is sent twice
+                delay = self._backoff(attempt, response)
+                if attempt == self.max_retries or time.monotonic() + delay >= deadline:
+                    raise LLMGatewayError(
+                        f"LLM stream failed after {attempt + 1} attempt(s): {str(error) or type(error).__name__}"
+                    )
+                with self._lock:
+                    self.retries += 1
+                await asyncio.sleep(delay)
+        except Exception as e:
+            out.put(e)
+        finally:
+            out.put(_DONE)
+
+    def stream(self, messages: List[Dict], model: str = None, temperature: float = 0.7,
+               max_tokens: int = 500, timeout: float = None) -> Iterator[str]:
+        """Yield completion tokens as they arrive, within the deadline"""
+        start = time.monotonic()
+        deadline = start + (timeout or self.timeout)
+        out = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(
+            self._stream(self._payload(messages, model, temperature, max_tokens, stream=True), deadline, out),
+            self._loop
+        )
+        with self._lock:
+            self.calls += 1
+        try:
+            while True:
+                try:
+                    item = out.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    raise LLMGatewayError("LLM stream exceeded its deadline")
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item if isinstance(item, LLMGatewayError) else LLMGatewayError(str(item) or type(item).__name__)
+                yield item
+        except GeneratorExit:
+            raise
+        except BaseException:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            future.cancel()  # Stops the request if the reader gave up early
+        with self._lock:
+            self.latencies.append(time.monotonic() - start)
+
+    def stats(self) -> Dict:
+        """Call counts, retries, hedging and latency percentiles (ms)"""
+        with self._lock:
+            latencies = list(self.latencies)
+            return {
+                "calls": self.calls,
+                "failed": self.failed,
+                "retries": self.retries,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "p50_ms": percentile(latencies, 0.50) * 1000,
+                "p95_ms": percentile(latencies, 0.95) * 1000,
+            }
@@ -0,0 +1,228 @@
+import smtplib
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from app.config import Config
+from app.metrics import percentile
+
+
+def build_message(to_email: str, subject: str, body: str) -> MIMEMultipart:
+    """Wrap an HTML body fragment in the confirmation email template"""
+    msg = MIMEMultipart('alternative')
+    msg['From'] = Config.EMAIL_SENDER
+    msg['To'] = to_email
+    msg['Subject'] = subject
+
+    # HTML body
+    html_body = f"""
+    <html>
+    <body style="font-family: Arial, sans-serif; padding: 20px;">
+        <h2 style="color: #2c3e50;">Appointment Confirmation</h2>
+        <div style="background-color: #f8f9fa; padding: 20px; border-radius: 5px;">
+            {body}
+        </div>
+        <p style="margin-top: 20px; color: #7f8c8d;">
+            If you need to reschedule or cancel, please contact us.
+        </p>
+        <hr style="border: 1px solid #ecf0f1;">
+        <p style="color: #95a5a6; font-size: 12px;">
+            This is an automated message. Please do not reply to this email.
+        </p>
+    </body>
+    </html>
+    """
+
+    msg.attach(MIMEText(html_body, 'html'))
+    return msg
+
+
+class _Session:
+    """One pooled SMTP connection"""
+
+    def __init__(self):
+        self.server = None
+        self.last_used = 0.0
+
+
+class SMTPPool:
+    """
+    Pool of authenticated SMTP sessions kept alive between sends.
+
+    Saves the TCP + STARTTLS + AUTH handshake on every message after the
+    first, and lets a batch of emails go out over one session. A session
+    the server has dropped (SMTPServerDisconnected) is reconnected and the
+    message retried once.
+    """
+
+    def __init__(self, size: int = None, idle_timeout: float = None):
+        self.size = size or Config.SMTP_POOL_SIZE
+        self.idle_timeout = idle_timeout if idle_timeout is not None else Config.SMTP_IDLE_TIMEOUT
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._idle = []
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.latencies = deque(maxlen=500)  # Seconds per send, most recent
+        self.sent = 0
+        self.failed = 0
+        self.connects = 0
+        self.in_use = 0
+        self.waiting = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(Config.SMTP_HOST, Config.SMTP_PORT, timeout=Config.SMTP_TIMEOUT)
+        try:
+            if Config.SMTP_STARTTLS:
+                server.starttls()
+            if Config.SMTP_AUTH:
+                server.login(Config.EMAIL_SENDER, Config.EMAIL_PASSWORD)
+        except Exception:
+            self._close(server)
+            raise
+        with self._lock:
+            self.connects += 1
+        return server
+
+    @staticmethod
+    def _close(server: Optional[smtplib.SMTP]) -> None:
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    @contextmanager
+    def session(self) -> Iterator[_Session]:
+        """Borrow a session; it goes back to the pool unless it broke"""
+        with self._lock:
+            self.waiting += 1
+        self._slots.acquire()
+        with self._lock:
+            self.waiting -= 1
+            self.in_use += 1
+            session = self._idle.pop() if self._idle else _Session()
+
+        if session.server is not None and time.monotonic() - session.last_used > self.idle_timeout:
+            # Likely dropped by the server already; don't bother probing it
+            self._close(session.server)
+            session.server = None
+
+        try:
+            yield session
+        finally:
+            session.last_used = time.monotonic()
+            with self._lock:
+                self.in_use -= 1
+                if session.server is not None:
+                    self._idle.append(session)
+            self._slots.release()
+
+    def _send_on(self, session: _Session, msg) -> tuple[bool, str]:
+        start = time.perf_counter()
+        for _ in range(2):
+            try:
+                if session.server is None:
+                    session.server = self._connect()
+                session.server.send_message(msg)
+                success, message = True, "Email sent successfully"
+                break
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                # Stale session dropped by the server - reconnect and retry once
+                self._close(session.server)
+                session.server = None
+                success, message = False, "SMTP server disconnected"
+            except smtplib.SMTPAuthenticationError:
+                self._close(session.server)
+                session.server = None
+                success, message = False, "Email authentication failed. Please check credentials."
+                break
+            except smtplib.SMTPRecipientsRefused as e:
+                # Session is still fine, only this message is rejected
+                success, message = False, f"SMTP error: {str(e)}"
+                break
+            except smtplib.SMTPException as e:
+                self._close(session.server)
+                session.server = None
+                success, message = False, f"SMTP error: {str(e)}"
+                break
+            except Exception as e:
+                self._close(session.server)
+                session.server = None
+                success, message = False, f"Email error: {str(e)}"
+                break
+
+        with self._lock:
+            self.latencies.append(time.perf_counter() - start)
+            if success:
+                self.sent += 1
+            else:
+                self.failed += 1
+        return success, message
+
+    def send(self, msg) -> tuple[bool, str]:
+        """Send one message over a pooled session"""
+        with self.session() as session:
+            return self._send_on(session, msg)
+
+    def send_many(self, messages: List) -> List[tuple[bool, str]]:
+        """Send a batch of messages over a single session"""
+        with self.session() as session:
+            return [self._send_on(session, msg) for msg in messages]
+
+    def close_all(self) -> None:
+        """Close idle sessions"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for session in idle:
+            self._close(session.server)
+
+    def stats(self) -> Dict:
+        """Send counts, per-send latency percentiles (ms) and pool occupancy"""
+        with self._lock:
+            latencies = list(self.latencies)
+            return {
+                "sent": self.sent,
+                "failed": self.failed,
+                "connects": self.connects,
+                "p50_ms": percentile(latencies, 0.50) * 1000,
+                "p95_ms": percentile(latencies, 0.95) * 1000,
+                "in_use": self.in_use,
+                "idle": len(self._idle),
+                "waiting": self.waiting,
+            }
+
+
+def _credentials_missing() -> bool:
+    return not Config.EMAIL_SENDER or (Config.SMTP_AUTH and not Config.EMAIL_PASSWORD)
+
+
+def send_email(to_email: str, subject: str, body: str, pool: SMTPPool) -> tuple[bool, str]:
+    """
+    Send one email over the SMTP pool
+    Returns: (success, message)
+    """
+    if _credentials_missing():
+        return False, "Email credentials not configured"
+    try:
+        return pool.send(build_message(to_email, subject, body))
+    except Exception as e:
+        return False, f"Email error: {str(e)}"
+
+
+def send_many(emails: List[Dict], pool: SMTPPool) -> List[tuple[bool, str]]:
+    """
+    Send a batch of {"to_email", "subject", "body"} dicts over one SMTP session
+    Returns: (success, message) per email
+    """
+    if _credentials_missing():
+        return [(False, "Email credentials not configured")] * len(emails)
+    try:
+        messages = [build_message(e["to_email"], e["subject"], e["body"]) for e in emails]
+        return pool.send_many(messages)
+    except Exception as e:
+        return [(False, f"Email error: {str(e)}")] * len(emails)
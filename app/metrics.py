@@ -0,0 +1,10 @@
+import math
+from typing import Iterable
+
+
+def percentile(values: Iterable[float], pct: float, default: float = 0.0) -> float:
+    """Nearest-rank percentile (pct in 0..1) of values, or default if there are none"""
+    ordered = sorted(values)
+    if not ordered:
+        return default
+    return ordered[max(0, math.ceil(len(ordered) * pct) - 1)]
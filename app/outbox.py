@@ -0,0 +1,182 @@
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class EmailOutbox:
+    """
+    Durable queue of outgoing emails in a local SQLite table.
+
+    Rows move pending -> sending -> sent, or back to pending with a backoff
+    delay on failure, until OUTBOX_MAX_ATTEMPTS is reached ('failed'). A row
+    claimed by a worker that dies is picked up again once its lease expires.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.OUTBOX_PATH
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS email_outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    to_email TEXT NOT NULL,
+                    subject TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    sent_at REAL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_outbox_due ON email_outbox(status, next_attempt_at)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Autocommit mode; claim_due opens its own transaction
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, to_email: str, subject: str, body: str) -> int:
+        """Queue an email; returns once the row is committed"""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO email_outbox (to_email, subject, body, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (to_email, subject, body, now, now)
+            )
+            return cursor.lastrowid
+
+    def claim_due(self, limit: int = None) -> List[Dict]:
+        """Atomically lease up to `limit` due emails to the calling worker"""
+        limit = limit or Config.OUTBOX_BATCH_SIZE
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(
+                    "SELECT id, to_email, subject, body, attempts FROM email_outbox "
+                    "WHERE status IN ('pending', 'sending') AND next_attempt_at <= ? "
+                    "ORDER BY next_attempt_at LIMIT ?",
+                    (now, limit)
+                ).fetchall()
+                conn.executemany(
+                    "UPDATE email_outbox SET status = 'sending', next_attempt_at = ? WHERE id = ?",
+                    [(now + Config.OUTBOX_LEASE_SECONDS, row[0]) for row in rows]
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        return [
+            {"id": r[0], "to_email": r[1], "subject": r[2], "body": r[3], "attempts": r[4]}
+            for r in rows
+        ]
+
+    def mark_sent(self, email_id: int) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE email_outbox SET status = 'sent', sent_at = ?, last_error = NULL WHERE id = ?",
+                (time.time(), email_id)
+            )
+
+    def mark_failed(self, email_id: int, attempts: int, error: str) -> None:
+        """Reschedule with jittered exponential backoff, or give up after the last attempt"""
+        attempts += 1
+        if attempts >= Config.OUTBOX_MAX_ATTEMPTS:
+            status, next_attempt_at = 'failed', time.time()
+        else:
+            delay = Config.OUTBOX_BACKOFF_SECONDS * (2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+            status, next_attempt_at = 'pending', time.time() + delay
+
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE email_outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? "
+                "WHERE id = ?",
+                (status, attempts, next_attempt_at, error, email_id)
+            )
+
+    def last_error(self) -> Optional[str]:
+        """Error of the most recently queued email that hasn't been sent, if any"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT last_error FROM email_outbox WHERE status <> 'sent' AND last_error IS NOT NULL "
+                "ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+        return row[0] if row else None
+
+    def counts(self) -> Dict[str, int]:
+        """Number of emails per status"""
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM email_outbox GROUP BY status").fetchall())
+
+
+class OutboxWorker(threading.Thread):
+    """Background thread that drains the outbox"""
+
+    def __init__(self, outbox: EmailOutbox, send_many: Callable[[List[Dict]], List[tuple[bool, str]]]):
+        super().__init__(name="email-outbox", daemon=True)
+        self.outbox = outbox
+        self.send_many = send_many
+        self.wakeup = threading.Event()
+        self.stopped = threading.Event()
+
+    def notify(self) -> None:
+        """Process the queue now instead of waiting for the next poll"""
+        self.wakeup.set()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.wakeup.set()
+
+    def run(self) -> None:
+        while not self.stopped.is_set():
+            # Clear before draining so a notify() that arrives mid-drain isn't lost
+            self.wakeup.clear()
+            try:
+                self.drain()
+            except Exception:
+                # Never let the worker die; the rows stay leased and get retried
+                logger.exception("Email outbox drain failed")
+            self.wakeup.wait(Config.OUTBOX_POLL_SECONDS)
+
+    def drain(self) -> int:
+        """Send everything that is due; returns the number sent"""
+        sent = 0
+        while True:
+            batch = self.outbox.claim_due()
+            if not batch:
+                return sent
+            # The whole batch goes out over one SMTP session
+            try:
+                results = self.send_many(batch)
+            except Exception as e:
+                logger.exception("Sending %d outbox email(s) failed", len(batch))
+                results = [(False, f"Email error: {str(e)}")] * len(batch)
+            for email, (success, message) in zip(batch, results):
+                if success:
+                    self.outbox.mark_sent(email["id"])
+                    sent += 1
+                else:
+                    # Row id only - the address and body are patient data
+                    logger.warning("Outbox email %d failed (attempt %d): %s",
+                                   email["id"], email["attempts"] + 1, message)
+                    self.outbox.mark_failed(email["id"], email["attempts"], message)
@@ -0,0 +1,36 @@
+import io
+import math
+from concurrent.futures import Executor, Future
+from pypdf import PdfReader
+from typing import Iterator, List
+
+# PDF text extraction straight from in-memory bytes, split by page range across
+# a process pool. Kept free of streamlit/langchain imports so that spawned
+# pool workers start quickly.
+
+
+def count_pages(data: bytes) -> int:
+    """Number of pages in a PDF"""
+    return len(PdfReader(io.BytesIO(data)).pages)
+
+
+def extract_page_range(data: bytes, start: int, stop: int) -> List[str]:
+    """Extract text of pages [start, stop) - runs inside a pool worker"""
+    reader = PdfReader(io.BytesIO(data))
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def submit_pages(pool: Executor, data: bytes, workers: int, min_pages_per_task: int = 1) -> List[Future]:
+    """Queue extraction of every page, roughly one page range per worker"""
+    num_pages = count_pages(data)
+    size = max(min_pages_per_task, math.ceil(num_pages / max(workers, 1)))
+    return [
+        pool.submit(extract_page_range, data, start, min(start + size, num_pages))
+        for start in range(0, num_pages, size)
+    ]
+
+
+def iter_pages(futures: List[Future]) -> Iterator[str]:
+    """Yield page texts in order, as soon as each range is done"""
+    for future in futures:
+        yield from future.result()
@@ -0,0 +1,39 @@
+import threading
+from typing import Dict, List, Optional
+import numpy as np
+
+
+class PrototypeMatcher:
+    """
+    Labels a message by its closest example sentence (cosine similarity).
+
+    Examples are embedded once, on first use, with the shared sentence
+    transformer. Callers pass the message embedding, so one vector can be
+    matched against several matchers and reused for retrieval.
+    """
+
+    def __init__(self, embeddings, examples: Dict[str, List[str]], threshold: float):
+        self.embeddings = embeddings
+        self.examples = examples
+        self.threshold = threshold
+        self._matrices = None  # label -> matrix of normalized vectors
+        self._lock = threading.Lock()
+
+    def scores(self, vector) -> Dict[str, float]:
+        """Best similarity per label"""
+        with self._lock:
+            if self._matrices is None:
+                self._matrices = {
+                    label: np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+                    for label, texts in self.examples.items()
+                }
+
+        # The shared model normalizes its embeddings, so a dot product is the cosine
+        vector = np.asarray(vector, dtype=np.float32)
+        return {label: float(np.max(matrix @ vector)) for label, matrix in self._matrices.items()}
+
+    def match(self, vector) -> Optional[str]:
+        """Closest label at or above the threshold, if any"""
+        scores = self.scores(vector)
+        best = max(scores, key=scores.get)
+        return best if scores[best] >= self.threshold else None
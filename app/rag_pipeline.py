@@ -1,37 +1,64 @@
-from pypdf import PdfReader
 from langchain.text_splitter import RecursiveCharacterTextSplitter  # ✅ Back to old style
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
-from langchain_groq import ChatGroq
-from langchain.chains import RetrievalQA  # ✅ Back to old style
+from langchain_core.prompts import ChatPromptTemplate
 from app.config import Config
+from app.resources import get_answer_cache, get_embeddings, get_llm_gateway, get_process_pool
+from app.history import condense_question
+from app.vector_cache import VectorCache
+from app.embedding_pipeline import EmbeddingPipeline
+from app.bm25 import BM25Index
+from app.hybrid_retriever import HybridRetriever
 import streamlit as st
-from typing import List
-import tempfile
-import os
+from typing import Dict, List, Optional, Tuple
+import hashlib
+
+# "Stuff" prompt: all retrieved chunks go into one system message
+STUFF_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "Use the following pieces of context to answer the user's question. \n"
+               "If you don't know the answer, just say that you don't know, don't try to make up an answer.\n"
+               "----------------\n{context}"),
+    ("human", "{question}"),
+])
+
+# Chat message types -> OpenAI-compatible roles
+MESSAGE_ROLES = {"system": "system", "human": "user", "ai": "assistant"}
 
 class RAGPipeline:
     """RAG system for PDF question answering"""
     
     def __init__(self):
         try:
-            # Use CPU explicitly and trust_remote_code for compatibility
-            self.embeddings = HuggingFaceEmbeddings(
-                model_name="sentence-transformers/all-MiniLM-L6-v2",
-                model_kwargs={'device': 'cpu'},
-                encode_kwargs={'normalize_embeddings': True}
-            )
+            # Shared across sessions - loaded once per process
+            self.embeddings = get_embeddings()
         except Exception as e:
             st.error(f"Error loading embeddings model: {str(e)}")
             # Fallback: will be handled when PDFs are processed
             self.embeddings = None
         
         self.vector_store = None
-        self.qa_chain = None
-        self.raw_texts = []  # Store raw PDF text for direct extraction
+        self.retriever = None
+        self.prompt = STUFF_PROMPT
+        self.vector_cache = VectorCache()
+        
+        # Indexed documents keyed by SHA-256 of the PDF bytes:
+        # {doc_id: {"name", "text", "chunk_ids"}}
+        self.documents = {}
+        # Chunk ids of removed documents still physically in the FAISS index
+        self.tombstones = set()
+        # Keyword index over the same chunks, fused with vector search at query time
+        self.bm25 = BM25Index()
+        # Shared across sessions; entries are namespaced by corpus_key(), so a
+        # change to the document set never serves answers from the old one
+        self.answer_cache = get_answer_cache()
+        self.llm = get_llm_gateway()
+    
+    @property
+    def raw_texts(self) -> List[str]:
+        """Raw PDF text for direct extraction, one entry per indexed document"""
+        return [doc["text"] for doc in self.documents.values()]
         
     def process_pdfs(self, pdf_files: List) -> bool:
-        """Process uploaded PDFs and create vector store"""
+        """Sync the index with the uploaded PDFs: add new ones, remove ones no longer uploaded"""
         try:
             st.write("### 🔧 RAG PROCESSING DEBUG")
             st.write("---")
@@ -40,114 +67,201 @@ class RAGPipeline:
             if self.embeddings is None:
                 st.write("**Initializing embeddings model...**")
                 try:
-                    self.embeddings = HuggingFaceEmbeddings(
-                        model_name="sentence-transformers/all-MiniLM-L6-v2",
-                        model_kwargs={'device': 'cpu'},
-                        encode_kwargs={'normalize_embeddings': True}
-                    )
+                    self.embeddings = get_embeddings()
                     st.success("✅ Embeddings model loaded")
                 except Exception as e:
                     st.error(f"Failed to load embedding model: {str(e)}")
                     st.info("Try restarting the app or check your internet connection.")
                     return False
             
-            all_texts = []
-            self.raw_texts = []  # Clear previous texts
-            
             st.write(f"**Processing {len(pdf_files)} PDF file(s)...**")
             
-            # Extract text from all PDFs
-            for pdf_file in pdf_files:
-                st.write(f"📄 Processing: {pdf_file.name}")
-                
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
-                    tmp.write(pdf_file.read())
-                    tmp_path = tmp.name
-                
-                try:
-                    reader = PdfReader(tmp_path)
-                    text = ""
-                    for page_num, page in enumerate(reader.pages):
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n"
-                            st.write(f"  - Page {page_num + 1}: {len(page_text)} chars")
-                    
-                    if text.strip():
-                        all_texts.append(text)
-                        self.raw_texts.append(text)  # Store raw text
-                        
-                        st.success(f"✅ Extracted {len(text)} total characters from {pdf_file.name}")
-                        st.code(text[:200], language="text")  # Show first 200 chars
-                    else:
-                        st.warning(f"⚠️ No text extracted from {pdf_file.name}")
-                        
-                finally:
-                    os.unlink(tmp_path)
-            
-            if not all_texts:
+            doc_ids = self.add_documents([(pdf_file.name, pdf_file.getvalue()) for pdf_file in pdf_files])
+            uploaded_ids = {doc_id for doc_id in doc_ids if doc_id}
+            
+            # Drop documents that were removed from the uploader
+            for doc_id in list(self.documents):
+                if doc_id not in uploaded_ids:
+                    self.remove_document(doc_id)
+            
+            if not self.documents:
                 st.error("❌ No text extracted from any PDFs")
                 return False
             
             st.write("---")
             st.write(f"**📊 Extraction Summary:**")
-            st.write(f"- Total texts extracted: {len(all_texts)}")
             st.write(f"- Raw texts stored: {len(self.raw_texts)}")
-            st.write(f"- Total characters: {sum(len(t) for t in all_texts)}")
+            st.write(f"- Total characters: {sum(len(t) for t in self.raw_texts)}")
+            st.write(f"- Total chunks indexed: {sum(len(d['chunk_ids']) for d in self.documents.values())}")
+            
+            st.write("---")
+            st.success("✅ **RAG PIPELINE READY**")
+            return True
             
-            # Split into chunks
-            st.write("\n**Creating text chunks...**")
+        except Exception as e:
+            st.error(f"❌ Error processing PDFs: {str(e)}")
+            import traceback
+            st.code(traceback.format_exc())
+            return False
+    
+    def add_document(self, name: str, data: bytes) -> Optional[str]:
+        """
+        Index one PDF, appending its chunks to the existing vector store.
+        Returns: document id (SHA-256 of the bytes), or None if no text was found
+        """
+        return self.add_documents([(name, data)])[0]
+    
+    def add_documents(self, files: List[Tuple[str, bytes]]) -> List[Optional[str]]:
+        """
+        Index several PDFs. Cached documents are loaded from disk; the rest are
+        extracted in the process pool and embedded in batches.
+        Returns: document id per file, None where no text was found
+        """
+        doc_ids = []
+        jobs = []
+        for name, data in files:
+            doc_id = self.vector_cache.hash_bytes(data)
+            doc_ids.append(doc_id)
+            
+            if doc_id in self.documents:
+                st.info(f"ℹ️ {name} is already indexed")
+                continue
+            
+            cached = self.vector_cache.load(doc_id)
+            if cached:
+                st.success(f"⚡ Loaded {len(cached['chunks'])} cached chunks for {name} (sha256 {doc_id[:12]})")
+                self._index_document(doc_id, name, cached["text"], cached["chunks"], cached["vectors"])
+            elif doc_id not in {job[0] for job in jobs}:
+                jobs.append((doc_id, name, data))
+        
+        if jobs:
             text_splitter = RecursiveCharacterTextSplitter(
                 chunk_size=Config.CHUNK_SIZE,
                 chunk_overlap=Config.CHUNK_OVERLAP,
                 length_function=len
             )
+            pipeline = EmbeddingPipeline(self.embeddings, text_splitter, get_process_pool())
             
-            chunks = []
-            for text in all_texts:
-                text_chunks = text_splitter.split_text(text)
-                chunks.extend(text_chunks)
-                st.write(f"  - Created {len(text_chunks)} chunks")
+            status = st.empty()
+            def show_progress(stats):
+                status.write(f"  - Embedded {stats['chunks']} chunks ({stats['chunks_per_sec']:.1f} chunks/sec)")
             
-            if not chunks:
-                st.error("❌ No text chunks created from PDFs")
-                return False
-            
-            st.success(f"✅ Created {len(chunks)} total chunks")
+            for result in pipeline.run(jobs, progress=show_progress):
+                name, text, chunks = result["name"], result["text"], result["chunks"]
+                
+                if not chunks:
+                    st.warning(f"⚠️ No text extracted from {name}")
+                    continue
+                
+                st.success(f"✅ Extracted {len(text)} total characters and {len(chunks)} chunks from {name}")
+                st.code(text[:200], language="text")  # Show first 200 chars
+                
+                self.vector_cache.save(result["doc_id"], text, chunks, result["vectors"])
+                self._index_document(result["doc_id"], name, text, chunks, result["vectors"])
             
-            # Create vector store
-            st.write("\n**Creating vector store...**")
-            self.vector_store = FAISS.from_texts(
-                chunks,
-                self.embeddings
+            stats = pipeline.throughput()
+            st.write(
+                f"**⏱️ Embedding:** {stats['pages']} pages, {stats['chunks']} chunks in "
+                f"{stats['total_seconds']:.1f}s ({stats['chunks_per_sec']:.1f} chunks/sec)"
             )
-            st.success("✅ Vector store created")
-            
-            # Create QA chain
-            st.write("\n**Creating QA chain...**")
-            llm = ChatGroq(
-                api_key=Config.GROQ_API_KEY,
-                model_name=Config.GROQ_MODEL,
-                temperature=0.1  # Lower temperature for extraction
+        
+        self._refresh_retriever()
+        return [doc_id if doc_id in self.documents else None for doc_id in doc_ids]
+    
+    def _index_document(self, doc_id: str, name: str, text: str, chunks: List[str], vectors) -> None:
+        """Append one document's chunks to the vector store"""
+        chunk_ids = [f"{doc_id}:{i}" for i in range(len(chunks))]
+        metadatas = [
+            {"doc_id": doc_id, "source": name, "chunk": i}
+            for i in range(len(chunks))
+        ]
+        
+        if self.vector_store is None:
+            self.vector_store = FAISS.from_embeddings(
+                list(zip(chunks, vectors)),
+                self.embeddings,
+                metadatas=metadatas,
+                ids=chunk_ids
             )
-            
-            self.qa_chain = RetrievalQA.from_chain_type(
-                llm=llm,
-                chain_type="stuff",
-                retriever=self.vector_store.as_retriever(search_kwargs={"k": 5}),
-                return_source_documents=False
+        else:
+            # Re-adding a document that is still tombstoned: purge the old copy first
+            stale = [cid for cid in chunk_ids if cid in self.tombstones]
+            if stale:
+                self.vector_store.delete(stale)
+                self.tombstones.difference_update(stale)
+            self.vector_store.add_embeddings(
+                list(zip(chunks, vectors)),
+                metadatas=metadatas,
+                ids=chunk_ids
             )
-            st.success("✅ QA chain created")
-            
-            st.write("---")
-            st.success("✅ **RAG PIPELINE READY**")
-            return True
-            
-        except Exception as e:
-            st.error(f"❌ Error processing PDFs: {str(e)}")
-            import traceback
-            st.code(traceback.format_exc())
+        
+        for cid, chunk in zip(chunk_ids, chunks):
+            self.bm25.add(cid, chunk)
+        
+        self.documents[doc_id] = {"name": name, "text": text, "chunk_ids": chunk_ids}
+    
+    def remove_document(self, doc_id: str) -> bool:
+        """
+        Remove a document from the index.
+        Its chunks are tombstoned (filtered out of searches) and only physically
+        deleted from FAISS once tombstones make up a large share of the index.
+        """
+        doc = self.documents.pop(doc_id, None)
+        if doc is None:
             return False
+        
+        self.tombstones.update(doc["chunk_ids"])
+        for cid in doc["chunk_ids"]:
+            self.bm25.remove(cid)
+        
+        if not self.documents:
+            # Nothing left to search - drop the index entirely
+            self.vector_store = None
+            self.tombstones.clear()
+        elif len(self.tombstones) > Config.RAG_TOMBSTONE_RATIO * self.vector_store.index.ntotal:
+            self.vector_store.delete(list(self.tombstones))
+            self.tombstones.clear()
+        
+        self._refresh_retriever()
+        return True
+    
+    def corpus_key(self) -> str:
+        """Fingerprint of the indexed document set - namespaces cached answers"""
+        return hashlib.sha256("\n".join(sorted(self.documents)).encode()).hexdigest()
+    
+    def list_documents(self) -> List[Dict]:
+        """List indexed documents"""
+        return [
+            {"doc_id": doc_id, "name": doc["name"], "chunks": len(doc["chunk_ids"]), "chars": len(doc["text"])}
+            for doc_id, doc in self.documents.items()
+        ]
+    
+    def _search_kwargs(self) -> Dict:
+        """Extra FAISS search arguments - skip tombstoned chunks when there are any"""
+        search_kwargs = {}
+        if self.tombstones:
+            removed_docs = {cid.split(":", 1)[0] for cid in self.tombstones}
+            search_kwargs["filter"] = lambda metadata: metadata.get("doc_id") not in removed_docs
+            search_kwargs["fetch_k"] = len(self.tombstones)
+        return search_kwargs
+    
+    def _refresh_retriever(self):
+        """Point the hybrid retriever at the current index"""
+        if self.vector_store is None:
+            self.retriever = None
+            return
+        
+        if self.retriever is None:
+            self.retriever = HybridRetriever(
+                vectorstore=self.vector_store,
+                bm25=self.bm25,
+                k=Config.RAG_TOP_K,
+                candidates=Config.RAG_CANDIDATES,
+                search_kwargs=self._search_kwargs()
+            )
+        else:
+            self.retriever.vectorstore = self.vector_store
+            self.retriever.search_kwargs = self._search_kwargs()
     
     def get_raw_text(self) -> str:
         """Get all raw text from processed PDFs"""
@@ -168,41 +282,55 @@ class RAGPipeline:
         
         return combined
     
-    def query(self, question: str, chat_history: List = None) -> str:
-        """Query the RAG system"""
+    def query(self, question: str, chat_history: List = None, query_vector: List[float] = None) -> str:
+        """Query the RAG system (query_vector: embedding of the question, if the caller has it)"""
         try:
-            if not self.qa_chain:
+            if self.retriever is None:
                 return "Please upload PDFs first to enable document search."
             
-            # Build context from chat history if provided
-            context = ""
-            if chat_history:
-                recent_msgs = chat_history[-6:]  # Last 3 exchanges
-                context = "Recent conversation:\n"
-                for msg in recent_msgs:
-                    role = msg["role"].title()
-                    context += f"{role}: {msg['content']}\n"
-                context += "\n"
+            # Retrieve on the question (prefixed with the previous question for follow-ups
+            # like "and on Saturday?"), not the transcript - it also keeps the answer cache hitting
+            enhanced_query = condense_question(question, chat_history)
             
-            # Create enhanced query
-            enhanced_query = f"{context}Question: {question}"
+            # One embedding serves both the answer cache and vector retrieval
+            if query_vector is None or enhanced_query != question:
+                query_vector = self.embeddings.embed_query(enhanced_query)
+            namespace = self.corpus_key()
             
-            result = self.qa_chain.invoke({"query": enhanced_query})
-            return result.get("result", "I couldn't find an answer in the documents.")
+            cached = self.answer_cache.lookup(namespace, query_vector)
+            if cached is not None:
+                return cached
+            
+            docs = self.retriever.retrieve(enhanced_query, query_vector=query_vector)
+            answer = self._answer(enhanced_query, docs) or "I couldn't find an answer in the documents."
+            
+            if "couldn't find" not in answer.lower():
+                self.answer_cache.store(namespace, query_vector, answer)
+            return answer
             
         except Exception as e:
             st.error(f"Error querying documents: {str(e)}")
             return "An error occurred while searching the documents."
     
+    def _answer(self, question: str, docs: List) -> str:
+        """Fill the "stuff" prompt with the retrieved chunks and complete it via the LLM gateway"""
+        messages = self.prompt.format_messages(
+            context="\n\n".join(doc.page_content for doc in docs),
+            question=question
+        )
+        return self.llm.complete(
+            [{"role": MESSAGE_ROLES[m.type], "content": m.content} for m in messages],
+            temperature=0.1,  # Answer from the retrieved context, not creatively
+            max_tokens=None
+        )
+    
     def is_ready(self) -> bool:
         """Check if RAG system is ready"""
-        is_ready = (self.vector_store is not None and 
-                   self.qa_chain is not None and 
-                   len(self.raw_texts) > 0)
+        is_ready = self.retriever is not None and len(self.raw_texts) > 0
         
         st.write("### 🔍 is_ready() CHECK")
         st.write(f"  - vector_store exists: {self.vector_store is not None}")
-        st.write(f"  - qa_chain exists: {self.qa_chain is not None}")
+        st.write(f"  - retriever exists: {self.retriever is not None}")
         st.write(f"  - raw_texts count: {len(self.raw_texts)}")
         st.write(f"  - **Result: {is_ready}**")
         
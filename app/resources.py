@@ -0,0 +1,115 @@
+import multiprocessing
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from supabase import create_client, Client
+from langchain_community.embeddings import HuggingFaceEmbeddings
+import streamlit as st
+from app.config import Config
+from app.semantic_cache import SemanticCache
+from app.availability import AvailabilityIndex
+from app.intent import IntentClassifier
+from app.llm_gateway import LLMGateway
+from app.router import LocalRouter
+from app.mailer import SMTPPool, send_many
+from app.outbox import EmailOutbox, OutboxWorker
+from app.llm_cache import LLMResponseCache, MemoryCacheBackend, SQLiteCacheBackend
+
+# Process-wide resources shared by every Streamlit session.
+# st.cache_resource builds each object once per worker process (guarded by a
+# lock, so concurrent first visitors don't race) and hands the same instance to
+# all sessions. Per-session state (messages, booking data, uploaded documents)
+# stays in st.session_state.
+
+
+@st.cache_resource(show_spinner="Loading embeddings model...")
+def get_embeddings() -> HuggingFaceEmbeddings:
+    """Shared sentence-transformer embeddings model"""
+    return HuggingFaceEmbeddings(
+        model_name=Config.EMBEDDING_MODEL,
+        model_kwargs={'device': 'cpu'},
+        encode_kwargs={'normalize_embeddings': True}
+    )
+
+
+@st.cache_resource
+def get_llm_gateway() -> LLMGateway:
+    """Shared async LLM client: one HTTP/2 connection pool and concurrency limit per process"""
+    return LLMGateway()
+
+
+@st.cache_resource
+def get_supabase_client() -> Client:
+    """Shared Supabase client"""
+    return create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+
+
+@st.cache_resource
+def get_process_pool() -> ProcessPoolExecutor:
+    """Shared process pool for CPU-bound PDF text extraction"""
+    # spawn, not fork: the parent holds torch/tokenizer threads that don't survive a fork
+    return ProcessPoolExecutor(
+        max_workers=Config.PDF_WORKERS,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+@st.cache_resource
+def get_answer_cache() -> SemanticCache:
+    """Shared semantic cache of RAG answers"""
+    return SemanticCache()
+
+
+@st.cache_resource
+def get_llm_cache() -> LLMResponseCache:
+    """Shared exact-match cache for deterministic LLM calls"""
+    if Config.LLM_CACHE_BACKEND == "sqlite":
+        backend = SQLiteCacheBackend(Config.LLM_CACHE_PATH, Config.LLM_CACHE_MAX_ENTRIES, Config.LLM_CACHE_TTL)
+    else:
+        backend = MemoryCacheBackend(Config.LLM_CACHE_MAX_ENTRIES)
+    return LLMResponseCache(backend)
+
+
+@st.cache_resource
+def get_smtp_pool() -> SMTPPool:
+    """Shared pool of authenticated SMTP sessions"""
+    return SMTPPool()
+
+
+@st.cache_resource
+def get_email_outbox() -> tuple[EmailOutbox, OutboxWorker]:
+    """Shared email outbox and its background delivery worker (one per process)"""
+    outbox = EmailOutbox(Config.OUTBOX_PATH)
+    worker = OutboxWorker(outbox, partial(send_many, pool=get_smtp_pool()))
+    worker.start()
+    return outbox, worker
+
+
+@st.cache_resource
+def get_database():
+    """Shared storage backend selected by Config.DB_BACKEND (a db.base.BaseDatabase)"""
+    # Imported here: db.database imports this module
+    if Config.DB_BACKEND == "sqlite":
+        from db.sqlite_database import SQLiteDatabase
+        return SQLiteDatabase(Config.SQLITE_DB_PATH)
+    from db.database import Database
+    return Database()
+
+
+@st.cache_resource
+def get_availability_index() -> AvailabilityIndex:
+    """Shared index of open/taken appointment slots, loaded from the bookings table"""
+    index = AvailabilityIndex(loader=get_database().get_taken_slots)
+    index.refresh(force=True)
+    return index
+
+
+@st.cache_resource
+def get_intent_classifier() -> IntentClassifier:
+    """Shared intent classifier; its embedding tier reuses the shared MiniLM model"""
+    return IntentClassifier(get_embeddings() if Config.INTENT_EMBEDDINGS else None)
+
+
+@st.cache_resource
+def get_local_router() -> LocalRouter:
+    """Shared FAQ router; reuses the shared MiniLM model and the department schedules"""
+    return LocalRouter(get_embeddings(), get_availability_index().describe_hours)
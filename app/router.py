@@ -0,0 +1,98 @@
+import threading
+from typing import Callable, Dict, List, Optional
+from app.config import Config
+from app.prototypes import PrototypeMatcher
+
+# Canned intents answered without the LLM: example phrasings per route
+ROUTE_EXAMPLES: Dict[str, List[str]] = {
+    "hours": [
+        "What are your opening hours?",
+        "When are you open?",
+        "What time do you close?",
+        "Are you open on Saturday?",
+        "What days is the clinic open?",
+        "When does cardiology see patients?",
+    ],
+    "services": [
+        "What services do you offer?",
+        "Which departments do you have?",
+        "What kind of doctors are there?",
+        "What appointment types can I book?",
+        "Do you have a dentist?",
+    ],
+    "thanks": [
+        "Thanks",
+        "Thank you so much",
+        "Thanks for your help",
+        "Great, thank you",
+        "I appreciate it",
+    ],
+    "goodbye": [
+        "Bye",
+        "Goodbye",
+        "That's all, thanks",
+        "See you later",
+        "Have a nice day",
+    ],
+}
+
+
+class LocalRouter:
+    """
+    Answers FAQ-style messages (opening hours, services, thanks, goodbye) from
+    the clinic configuration instead of the LLM.
+
+    The message embedding (computed once by the caller) is compared with
+    ROUTE_EXAMPLES; only a match above ROUTER_THRESHOLD is answered
+    locally, anything else is passed on. Counts how many LLM-bound messages
+    were answered here.
+    """
+
+    def __init__(self, embeddings, describe_hours: Callable[[str], str],
+                 threshold: float = None, max_words: int = None):
+        self.examples = PrototypeMatcher(
+            embeddings, ROUTE_EXAMPLES,
+            threshold if threshold is not None else Config.ROUTER_THRESHOLD
+        )
+        self.describe_hours = describe_hours
+        self.max_words = max_words or Config.ROUTER_MAX_WORDS
+        self._lock = threading.Lock()
+        self.answered = 0
+        self.passed = 0
+
+    def route(self, message: str, vector) -> Optional[str]:
+        """Local answer for the message (given its embedding), or None if it should go to the LLM"""
+        # FAQ phrasings are short; longer messages carry details the LLM should see
+        route = None
+        if message.strip() and len(message.split()) <= self.max_words:
+            route = self.examples.match(vector)
+        with self._lock:
+            if route is None:
+                self.passed += 1
+            else:
+                self.answered += 1
+        return self.answer(route) if route else None
+
+    def answer(self, route: str) -> str:
+        """Canned answer for a route, built from the current configuration"""
+        if route == "hours":
+            lines = [f"- **{t}:** {self.describe_hours(t) or 'by arrangement'}" for t in Config.BOOKING_TYPES]
+            return ("🕘 **Opening hours by department:**\n" + "\n".join(lines) +
+                    "\n\nWould you like to book an appointment?")
+        if route == "services":
+            lines = [f"{i}. {t}" for i, t in enumerate(Config.BOOKING_TYPES, 1)]
+            return ("🏥 **Available Appointment Types:**\n" + "\n".join(lines) +
+                    "\n\nJust let me know which one you need and I'll help you book it.")
+        if route == "thanks":
+            return "You're welcome! Is there anything else I can help you with?"
+        return "Goodbye and take care! Come back any time you need to book an appointment. 🏥"
+
+    def stats(self) -> Dict:
+        """Messages answered locally vs passed on to the LLM"""
+        with self._lock:
+            total = self.answered + self.passed
+            return {
+                "answered": self.answered,
+                "passed": self.passed,
+                "avoided_rate": self.answered / total if total else 0.0,
+            }
@@ -0,0 +1,91 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+from app.config import Config
+
+
+class SemanticCache:
+    """
+    Answer cache matched by cosine similarity of query embeddings.
+
+    Entries live in a namespace (the fingerprint of the indexed document set),
+    so answers are never served for a different set of documents. Expired
+    entries are dropped on access; beyond max_entries the least recently used
+    entry is evicted.
+    """
+
+    def __init__(self, threshold: float = None, ttl: float = None, max_entries: int = None):
+        self.threshold = threshold if threshold is not None else Config.SEMANTIC_CACHE_THRESHOLD
+        self.ttl = ttl if ttl is not None else Config.SEMANTIC_CACHE_TTL
+        self.max_entries = max_entries or Config.SEMANTIC_CACHE_MAX_ENTRIES
+        self.entries = OrderedDict()  # id -> {"namespace", "vector", "answer", "expires"}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    def lookup(self, namespace: str, vector: List[float]) -> Optional[str]:
+        """Cached answer for the most similar query above the threshold, if any"""
+        query = self._normalize(vector)
+        now = time.time()
+
+        with self._lock:
+            best_id, best_score = None, self.threshold
+            for entry_id, entry in list(self.entries.items()):
+                if entry["expires"] < now:
+                    del self.entries[entry_id]
+                    continue
+                if entry["namespace"] != namespace:
+                    continue
+                score = float(np.dot(query, entry["vector"]))
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(best_id)
+            self.hits += 1
+            return self.entries[best_id]["answer"]
+
+    def store(self, namespace: str, vector: List[float], answer: str) -> None:
+        """Cache an answer"""
+        with self._lock:
+            self.entries[next(self._ids)] = {
+                "namespace": namespace,
+                "vector": self._normalize(vector),
+                "answer": answer,
+                "expires": time.time() + self.ttl,
+            }
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, namespace: str = None) -> None:
+        """Drop all entries, or only those of one namespace"""
+        with self._lock:
+            if namespace is None:
+                self.entries.clear()
+            else:
+                for entry_id in [i for i, e in self.entries.items() if e["namespace"] == namespace]:
+                    del self.entries[entry_id]
+
+    def stats(self) -> Dict:
+        """Hit/miss counters"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self.entries),
+            }
@@ -1,20 +1,17 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from typing import Dict, Optional
 import streamlit as st
-from app.config import Config
-from db.database import Database
 from app.rag_pipeline import RAGPipeline
+from app.mailer import send_email
+from app.resources import get_availability_index, get_database, get_email_outbox, get_smtp_pool
 
 class Tools:
     """Tool implementations for the booking assistant"""
     
     def __init__(self):
-        self.db = Database()
+        self.db = get_database()
         self.rag = RAGPipeline()
     
-    def rag_query(self, query: str, chat_history: list = None) -> str:
+    def rag_query(self, query: str, chat_history: list = None, query_vector: list = None) -> str:
         """
         Tool: RAG Query
         Search uploaded documents for relevant information
@@ -23,7 +20,7 @@ class Tools:
             if not self.rag.is_ready():
                 return "No documents have been uploaded yet. Please upload PDFs to search."
             
-            return self.rag.query(query, chat_history)
+            return self.rag.query(query, chat_history, query_vector)
         except Exception as e:
             return f"Error searching documents: {str(e)}"
     
@@ -34,11 +31,21 @@ class Tools:
         Returns: (success, booking_id, message)
         """
         try:
+            availability = get_availability_index()
+            slot = (booking_data["booking_type"], booking_data["date"], booking_data["time"])
+            if not availability.is_open(*slot):
+                return False, None, f"{slot[0]} is not available at {slot[2]} on {slot[1]}"
+            if not availability.is_free(*slot):
+                return False, None, "That time slot is no longer available"
+            
             booking_id = self.db.create_booking(booking_data)
             
             if booking_id:
+                availability.reserve(*slot)
                 return True, booking_id, f"Booking saved successfully with ID: {booking_id}"
             else:
+                # Possibly lost a race for the slot - resync with the database
+                availability.refresh(force=True)
                 return False, None, "Failed to save booking to database"
                 
         except Exception as e:
@@ -47,54 +54,24 @@ class Tools:
     def send_email(self, to_email: str, subject: str, body: str) -> tuple[bool, str]:
         """
         Tool: Send Email
-        Send confirmation email via SMTP
+        Send confirmation email via SMTP right away
+        Returns: (success, message)
+        """
+        return send_email(to_email, subject, body, get_smtp_pool())
+    
+    def queue_email(self, to_email: str, subject: str, body: str) -> tuple[bool, str]:
+        """
+        Tool: Queue Email
+        Add email to the outbox; a background worker delivers it with retries
         Returns: (success, message)
         """
         try:
-            if not Config.EMAIL_SENDER or not Config.EMAIL_PASSWORD:
-                return False, "Email credentials not configured"
-            
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['From'] = Config.EMAIL_SENDER
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            # HTML body
-            html_body = f"""
-            <html>
-            <body style="font-family: Arial, sans-serif; padding: 20px;">
-                <h2 style="color: #2c3e50;">Appointment Confirmation</h2>
-                <div style="background-color: #f8f9fa; padding: 20px; border-radius: 5px;">
-                    {body}
-                </div>
-                <p style="margin-top: 20px; color: #7f8c8d;">
-                    If you need to reschedule or cancel, please contact us.
-                </p>
-                <hr style="border: 1px solid #ecf0f1;">
-                <p style="color: #95a5a6; font-size: 12px;">
-                    This is an automated message. Please do not reply to this email.
-                </p>
-            </body>
-            </html>
-            """
-            
-            msg.attach(MIMEText(html_body, 'html'))
-            
-            # Send via Gmail SMTP
-            with smtplib.SMTP('smtp.gmail.com', 587) as server:
-                server.starttls()
-                server.login(Config.EMAIL_SENDER, Config.EMAIL_PASSWORD)
-                server.send_message(msg)
-            
-            return True, "Email sent successfully"
-            
-        except smtplib.SMTPAuthenticationError:
-            return False, "Email authentication failed. Please check credentials."
-        except smtplib.SMTPException as e:
-            return False, f"SMTP error: {str(e)}"
+            outbox, worker = get_email_outbox()
+            outbox.enqueue(to_email, subject, body)
+            worker.notify()
+            return True, "Email queued for delivery"
         except Exception as e:
-            return False, f"Email error: {str(e)}"
+            return False, f"Email queue error: {str(e)}"
     
     def format_confirmation_email(self, booking_data: Dict, booking_id: int) -> tuple[str, str]:
         """
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Optional
+import numpy as np
+from app.config import Config
+
+
+class VectorCache:
+    """On-disk store of extracted text, chunks and embeddings, keyed by the SHA-256 of each PDF"""
+
+    def __init__(self, root: str = None):
+        # Vectors depend on the model and chunking settings, so they are part of the path
+        model_slug = Config.EMBEDDING_MODEL.replace("/", "__")
+        self.root = os.path.join(
+            root or Config.VECTOR_STORE_DIR,
+            f"{model_slug}-{Config.CHUNK_SIZE}-{Config.CHUNK_OVERLAP}"
+        )
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        """Content hash used as the cache key"""
+        return hashlib.sha256(data).hexdigest()
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest)
+
+    def contains(self, digest: str) -> bool:
+        """Check if a document has been embedded before"""
+        return os.path.exists(os.path.join(self._path(digest), "vectors.npy"))
+
+    def load(self, digest: str) -> Optional[Dict]:
+        """
+        Load a cached document.
+        Vectors are memory-mapped, so nothing is read until FAISS copies them.
+        Returns: {"text", "chunks", "vectors"} or None on a miss
+        """
+        path = self._path(digest)
+        if not self.contains(digest):
+            return None
+
+        try:
+            with open(os.path.join(path, "text.txt"), encoding="utf-8") as f:
+                text = f.read()
+            with open(os.path.join(path, "chunks.json"), encoding="utf-8") as f:
+                chunks = json.load(f)
+            vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        except (OSError, ValueError):
+            # Corrupt or partially deleted entry - treat as a miss
+            return None
+
+        if len(chunks) != vectors.shape[0]:
+            return None
+
+        return {"text": text, "chunks": chunks, "vectors": vectors}
+
+    def save(self, digest: str, text: str, chunks: List[str], vectors) -> None:
+        """Persist a document. Written to a temp dir first so readers never see half an entry"""
+        path = self._path(digest)
+        os.makedirs(self.root, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=self.root, prefix=".tmp-")
+
+        try:
+            with open(os.path.join(tmp_dir, "text.txt"), "w", encoding="utf-8") as f:
+                f.write(text)
+            with open(os.path.join(tmp_dir, "chunks.json"), "w", encoding="utf-8") as f:
+                json.dump(chunks, f)
+            np.save(os.path.join(tmp_dir, "vectors.npy"), np.asarray(vectors, dtype=np.float32))
+
+            try:
+                os.replace(tmp_dir, path)
+            except OSError:
+                if not os.path.exists(path):
+                    raise
+                # Another worker got there first; their copy is identical
+                shutil.rmtree(tmp_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
@@ -0,0 +1,98 @@
+"""
+Latency benchmark: booking creation via 3 requests vs upsert + insert vs one RPC.
+
+Needs a Supabase/PostgREST stand-in with db/schema.sql applied, e.g. a local
+`supabase start` stack (the defaults below) or any PostgREST in front of Postgres.
+Rows are written with @bench.invalid emails and deleted afterwards.
+
+    BENCH_SUPABASE_URL=http://127.0.0.1:54321 BENCH_SUPABASE_KEY=<service key> \\
+        python -m benchmarks.bench_booking_create --n 200
+"""
+import argparse
+import os
+import statistics
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from supabase import create_client
+from app.metrics import percentile
+from db.database import Database
+
+
+def three_call_create(db: Database, data: dict) -> int:
+    """The original path: select customer, insert if missing, insert booking"""
+    result = db.client.table("customers").select("customer_id").eq("email", data["email"]).execute()
+    if result.data:
+        customer_id = result.data[0]["customer_id"]
+    else:
+        result = db.client.table("customers").insert({
+            "name": data["name"], "email": data["email"], "phone": data["phone"]
+        }).execute()
+        customer_id = result.data[0]["customer_id"]
+    result = db.client.table("bookings").insert({
+        "customer_id": customer_id,
+        "booking_type": data["booking_type"],
+        "date": data["date"],
+        "time": data["time"],
+        "status": "confirmed",
+        "created_at": datetime.now().isoformat()
+    }).execute()
+    return result.data[0]["id"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=200, help="bookings per strategy")
+    parser.add_argument("--returning", type=float, default=0.5,
+                        help="share of bookings made by an existing customer")
+    args = parser.parse_args()
+
+    client = create_client(
+        os.getenv("BENCH_SUPABASE_URL", "http://127.0.0.1:54321"),
+        os.environ["BENCH_SUPABASE_KEY"]
+    )
+    db = Database(client)
+    run_id = uuid.uuid4().hex[:8]
+
+    strategies = {
+        "3 requests": lambda data: three_call_create(db, data),
+        "upsert + insert": db._create_booking_sequential,
+        "rpc": db.create_booking,
+    }
+
+    try:
+        for s, (label, create) in enumerate(strategies.items()):
+            latencies = []
+            for i in range(args.n):
+                # Every n-th booking reuses the previous customer's email
+                returning = args.returning and i and i % round(1 / args.returning) == 0
+                customer = i - 1 if returning else i
+                data = {
+                    "name": f"Bench {customer}",
+                    "email": f"{run_id}-{s}-{customer}@bench.invalid",
+                    "phone": "5550000000",
+                    "booking_type": "General Consultation",
+                    # One slot per booking (day per iteration, half hour per strategy),
+                    # so the per-slot unique index is never hit
+                    "date": (date(2030, 1, 1) + timedelta(days=i)).isoformat(),
+                    "time": f"{9 + s // 2:02d}:{30 * (s % 2):02d}",
+                }
+                start = time.perf_counter()
+                booking_id = create(data)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if not booking_id:
+                    raise SystemExit(f"{label}: booking creation failed")
+                if db.booking_rpc_fallbacks:
+                    # Database.create_booking quietly took the sequential path - not an RPC timing
+                    raise SystemExit(f"{label}: create_booking_atomic is missing (PGRST202); "
+                                     "apply db/schema.sql before benchmarking")
+
+            print(f"{label:<16} p50 {statistics.median(latencies):7.1f} ms   "
+                  f"p95 {percentile(latencies, 0.95):7.1f} ms")
+    finally:
+        # Bookings go with their customers (ON DELETE CASCADE)
+        client.table("customers").delete().like("email", f"{run_id}-%@bench.invalid").execute()
+
+
+if __name__ == "__main__":
+    main()
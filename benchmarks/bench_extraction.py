@@ -0,0 +1,158 @@
+"""
+Throughput benchmark: booking field extraction, original per-call regexes vs app.extraction.
+
+Runs both implementations over a corpus of typical chat messages and PDF
+form texts, reports messages per second and lists any messages where the
+two disagree.
+
+    python -m benchmarks.bench_extraction --repeat 2000
+"""
+import argparse
+import re
+import time
+from datetime import datetime
+from app.config import Config
+from app.extraction import extract_from_document, extract_from_message
+
+MESSAGES = [
+    "Hi, I'd like to book an appointment",
+    "John Smith",
+    "My name is Sarah Connor.",
+    "I'm Alex Johnson",
+    "john.smith@example.com",
+    "You can reach me at 555-123-4567",
+    "+1 (555) 987-6543 is my number",
+    "Cardiology please",
+    "Dental",
+    "I need a General Consultation on 2030-03-14 at 10:30",
+    "How about 15/03/2030?",
+    "2030/03/16 14:00 works",
+    "Can I come at 9:30?",
+    "What are your opening hours on Saturday?",
+    "Do you accept Aetna insurance?",
+    "My name is Maria Garcia, email maria.g@mail.com, phone 5551112222, Pediatrics on 2030-04-01 at 11:00",
+    "yes",
+    "Thanks a lot!",
+]
+
+DOCUMENTS = [
+    "Patient Intake Form\nJane Doe\nEmail: jane.doe@example.com\nPhone: 5550001234\n"
+    "Appointment: Dermatology\nDate: 2030 - 05 - 20\nTime: 11:30",
+    "Booking Request\nRobert Brown\nr.brown @ example . org\n15559876543\nOrthopedics\n2030-06-02 13:00",
+]
+
+
+def legacy_extract_info(user_message: str) -> dict:
+    """BookingFlow.extract_info before app.extraction"""
+    extracted = {}
+    email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', user_message)
+    if email_match:
+        extracted["email"] = email_match.group()
+    phone_match = re.search(r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}', user_message)
+    if phone_match:
+        extracted["phone"] = re.sub(r'[^\d+]', '', phone_match.group())
+    for pattern in [r'\b(\d{4}[-/]\d{2}[-/]\d{2})\b', r'\b(\d{2}[-/]\d{2}[-/]\d{4})\b']:
+        date_match = re.search(pattern, user_message)
+        if date_match:
+            for fmt in ['%Y-%m-%d', '%Y/%m/%d', '%d-%m-%Y', '%d/%m/%Y']:
+                try:
+                    extracted["date"] = datetime.strptime(date_match.group(1), fmt).strftime('%Y-%m-%d')
+                    break
+                except ValueError:
+                    continue
+    time_match = re.search(r'\b([0-1]?[0-9]|2[0-3]):([0-5][0-9])\b', user_message)
+    if time_match:
+        extracted["time"] = time_match.group()
+    message_lower = user_message.lower()
+    for booking_type in Config.BOOKING_TYPES:
+        if booking_type.lower() in message_lower:
+            extracted["booking_type"] = booking_type
+            break
+    if "name is" in message_lower:
+        name_match = re.search(r'name is (.+?)(?:\.|$)', user_message, re.IGNORECASE)
+        if name_match:
+            extracted["name"] = name_match.group(1).strip().title()
+    elif "i'm" in message_lower or "i am" in message_lower:
+        name_match = re.search(r"(?:i'm|i am) (.+?)(?:\.|$)", user_message, re.IGNORECASE)
+        if name_match:
+            extracted["name"] = name_match.group(1).strip().title()
+    else:
+        words = user_message.strip().split()
+        if 1 <= len(words) <= 4 and words[0][0].isupper():
+            booking_type_keywords = [bt.lower() for bt in Config.BOOKING_TYPES]
+            booking_type_words = []
+            for bt in Config.BOOKING_TYPES:
+                booking_type_words.extend(bt.lower().split())
+            exclusion_keywords = ['book', 'appointment', 'email', '@', 'phone', 'time', 'date', ':', 'http'] \
+                + booking_type_keywords + booking_type_words
+            if not any(keyword in message_lower for keyword in exclusion_keywords):
+                extracted["name"] = user_message.strip().title()
+    return extracted
+
+
+def legacy_regex_fallback(raw_text: str) -> dict:
+    """ChatLogic._regex_fallback_extraction before app.extraction (without the UI output)"""
+    extracted = {}
+    email_match = re.search(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}', raw_text.replace(' ', ''))
+    if email_match:
+        extracted['email'] = email_match.group().lower()
+    phone_match = re.search(r'\d{10,}', raw_text)
+    if phone_match:
+        extracted['phone'] = phone_match.group()
+    date_match = re.search(r'(\d{4})\s*[-/]\s*(\d{2})\s*[-/]\s*(\d{2})', raw_text)
+    if date_match:
+        extracted['date'] = f"{date_match.group(1)}-{date_match.group(2)}-{date_match.group(3)}"
+    time_match = re.search(r'\b([0-2]?[0-9]):([0-5][0-9])\b', raw_text)
+    if time_match:
+        extracted['time'] = f"{int(time_match.group(1)):02d}:{time_match.group(2)}"
+    for booking_type in Config.BOOKING_TYPES:
+        if booking_type.lower() in raw_text.lower():
+            extracted['booking_type'] = booking_type
+            break
+    for line in [line.strip() for line in raw_text.split('\n') if line.strip()]:
+        words = line.split()
+        if (1 <= len(words) <= 4 and line[0].isupper()
+                and all(w.replace('.', '').replace(',', '').isalpha() for w in words)
+                and '@' not in line and not any(c.isdigit() for c in line)):
+            extracted['name'] = line.title()
+            break
+    return extracted
+
+
+def throughput(fn, corpus, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in corpus:
+            fn(text)
+    return repeat * len(corpus) / (time.perf_counter() - start)
+
+
+def normalized(result: dict) -> dict:
+    # The new extractor zero-pads hours ("9:30" -> "09:30"); compare on that form
+    if "time" in result:
+        hours, minutes = result["time"].split(":")
+        result = dict(result, time=f"{int(hours):02d}:{minutes}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    suites = [
+        ("chat messages", MESSAGES, legacy_extract_info, extract_from_message),
+        ("PDF texts", DOCUMENTS, legacy_regex_fallback, extract_from_document),
+    ]
+    for label, corpus, legacy, compiled in suites:
+        for text in corpus:
+            if normalized(legacy(text)) != compiled(text):
+                print(f"  differs on {text!r}:\n    legacy   {legacy(text)}\n    compiled {compiled(text)}")
+
+        before = throughput(legacy, corpus, args.repeat)
+        after = throughput(compiled, corpus, args.repeat)
+        print(f"{label:<14} legacy {before:>10,.0f} msg/s   compiled {after:>10,.0f} msg/s   x{after / before:.1f}")
+
+
+if __name__ == "__main__":
+    main()
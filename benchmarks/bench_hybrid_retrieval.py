@@ -0,0 +1,90 @@
+"""
+Recall/latency benchmark: FAISS vs BM25 vs hybrid (RRF) retrieval.
+
+Chunks docs/sample_medical_info.md, indexes it both ways and checks whether
+the chunk holding each expected answer is in the top-k results.
+
+    python -m benchmarks.bench_hybrid_retrieval --chunk-size 300 --k 3
+"""
+import argparse
+import statistics
+import time
+from pathlib import Path
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.vectorstores import FAISS
+from app.bm25 import BM25Index
+from app.hybrid_retriever import HybridRetriever, chunk_id
+from app.metrics import percentile
+from app.resources import get_embeddings
+
+GUIDE = Path(__file__).resolve().parent.parent / "docs" / "sample_medical_info.md"
+
+# (question, text that must appear in a retrieved chunk)
+QUERIES = [
+    ("Cardiologist hours Thursday", "Tuesday and Thursday, 2:00 PM - 6:00 PM"),
+    ("Do you accept Aetna?", "Aetna"),
+    ("Is UnitedHealthcare insurance accepted", "UnitedHealthcare"),
+    ("When is the dermatologist available?", "Wednesday and Friday, 11:00 AM - 4:00 PM"),
+    ("pediatrician hours", "Monday to Friday, 10:00 AM - 5:00 PM"),
+    ("orthopedist schedule", "Monday, Wednesday, Friday, 1:00 PM - 5:00 PM"),
+    ("What should I bring to my appointment?", "Insurance card"),
+    ("How late can I cancel?", "24 hours in advance"),
+    ("emergency phone number", "911-0000"),
+    ("Are you open on Sunday?", "Sunday"),
+    ("Is there parking?", "free parking"),
+    ("telemedicine video consultation", "video consultations"),
+    ("clinic address", "123 Healthcare Avenue"),
+    ("Saturday opening hours", "9:00 AM - 2:00 PM"),
+    ("Do you take Medicaid", "Medicaid"),
+    ("teeth cleaning", "Teeth cleaning"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunk-size", type=int, default=300)
+    parser.add_argument("--chunk-overlap", type=int, default=50)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+    chunks = splitter.split_text(GUIDE.read_text(encoding="utf-8"))
+    ids = [f"guide:{i}" for i in range(len(chunks))]
+    metadatas = [{"doc_id": "guide", "chunk": i} for i in range(len(chunks))]
+
+    embeddings = get_embeddings()
+    store = FAISS.from_texts(chunks, embeddings, metadatas=metadatas, ids=ids)
+    bm25 = BM25Index()
+    for cid, chunk in zip(ids, chunks):
+        bm25.add(cid, chunk)
+    hybrid = HybridRetriever(vectorstore=store, bm25=bm25, k=args.k)
+    texts = dict(zip(ids, chunks))
+
+    methods = {
+        "faiss": lambda q, v: [chunk_id(d) for d in store.similarity_search_by_vector(v, k=args.k)],
+        "bm25": lambda q, v: [cid for cid, _ in bm25.search(q, args.k)],
+        "hybrid": lambda q, v: [chunk_id(d) for d in hybrid.retrieve(q, query_vector=v)],
+    }
+
+    # Embed queries up front so timings compare the retrieval step only
+    vectors = [embeddings.embed_query(q) for q, _ in QUERIES]
+
+    print(f"{len(chunks)} chunks, {len(QUERIES)} queries, k={args.k}\n")
+    print(f"{'method':<8} {'recall@k':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, search in methods.items():
+        hits = 0
+        latencies = []
+        for (question, answer), vector in zip(QUERIES, vectors):
+            result = search(question, vector)
+            hits += any(answer in texts[cid] for cid in result)
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                search(question, vector)
+                latencies.append((time.perf_counter() - start) * 1000)
+        print(f"{name:<8} {hits / len(QUERIES):>9.2f} {statistics.median(latencies):>8.3f} "
+              f"{percentile(latencies, 0.95):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
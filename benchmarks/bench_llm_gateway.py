@@ -0,0 +1,122 @@
+"""
+Latency benchmark: app.llm_gateway against a local mock OpenAI-compatible server.
+
+The mock answers /chat/completions (plain and streamed) after a simulated
+delay, with a slow tail (--slow-rate of calls take --slow-ms) and a share of
+429s (--error-rate), so retries and hedging can be compared without an API key.
+Reports latency percentiles with hedging off and on.
+
+    python -m benchmarks.bench_llm_gateway --calls 200 --concurrency 16 --hedge-after 0.3
+
+Point the app itself at the mock with GROQ_BASE_URL=http://127.0.0.1:<port>/v1.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.llm_gateway import LLMGateway
+from app.metrics import percentile
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fast_ms = 50
+    slow_ms = 1500
+    slow_rate = 0.05
+    error_rate = 0.02
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json", headers=()):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The losing request of a hedged pair was cancelled
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if random.random() < self.error_rate:
+            self._send(429, b'{"error": {"message": "rate limited"}}', headers=[("Retry-After", "0.05")])
+            return
+
+        slow = random.random() < self.slow_rate
+        time.sleep((self.slow_ms if slow else self.fast_ms) / 1000)
+        text = f"Echo: {payload['messages'][-1]['content']}"
+
+        if not payload.get("stream"):
+            body = {"choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                                 "finish_reason": "stop"}]}
+            self._send(200, json.dumps(body).encode())
+            return
+
+        events = [{"choices": [{"index": 0, "delta": {"content": word + " "}}]} for word in text.split()]
+        stream = "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+        self._send(200, stream.encode(), content_type="text/event-stream")
+
+
+def start_mock_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run_calls(gateway: LLMGateway, calls: int, concurrency: int):
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with limit:
+            start = time.perf_counter()
+            await gateway.acomplete([{"role": "user", "content": f"message {i}"}], max_tokens=20)
+            return time.perf_counter() - start
+
+    return await asyncio.gather(*(one(i) for i in range(calls)))
+
+
+def report(label: str, latencies, stats):
+    pct = lambda p: percentile(latencies, p) * 1000
+    print(f"{label:<12} p50 {pct(0.50):7.0f} ms   p95 {pct(0.95):7.0f} ms   p99 {pct(0.99):7.0f} ms   "
+          f"mean {statistics.mean(latencies) * 1000:6.0f} ms   retries {stats['retries']}   "
+          f"hedges {stats['hedges']} ({stats['hedge_wins']} won)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--hedge-after", type=float, default=0.3)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-ms", type=int, default=1500)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    args = parser.parse_args()
+
+    MockHandler.slow_rate, MockHandler.slow_ms, MockHandler.error_rate = args.slow_rate, args.slow_ms, args.error_rate
+    server = start_mock_server()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    print(f"mock server at {base_url}")
+
+    for label, hedge_after in [("no hedging", 0.0), (f"hedge {args.hedge_after}s", args.hedge_after)]:
+        gateway = LLMGateway(base_url=base_url, api_key="bench", max_concurrency=args.concurrency * 2,
+                             hedge_after=hedge_after)
+        latencies = asyncio.run(run_calls(gateway, args.calls, args.concurrency))
+        report(label, latencies, gateway.stats())
+        gateway.close()
+
+    gateway = LLMGateway(base_url=base_url, api_key="bench")
+    print("stream:", "".join(gateway.stream([{"role": "user", "content": "streaming works"}])).strip())
+    gateway.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional
+
+
+class BaseDatabase(ABC):
+    """
+    Storage backend interface for bookings and customers.
+
+    Booking rows are dicts shaped like Supabase's select("*, customers(*)"):
+    the bookings columns plus a nested "customers" dict. Methods report errors
+    through the UI and return None / [] rather than raising.
+    """
+
+    @abstractmethod
+    def create_customer(self, name: str, email: str, phone: str) -> Optional[int]:
+        """Create or update the customer with this email; returns customer_id"""
+
+    @abstractmethod
+    def create_booking(self, booking_data: Dict) -> Optional[int]:
+        """Create a booking (and its customer); returns the booking id"""
+
+    @abstractmethod
+    def get_taken_slots(self, from_date: str) -> Optional[List[Dict]]:
+        """booking_type/date/time of active bookings on or after from_date (None on error)"""
+
+    @abstractmethod
+    def get_booking_stats(self) -> Dict[str, int]:
+        """Dashboard counters: total, today, confirmed, unique_customers"""
+
+    @abstractmethod
+    def get_all_bookings(self) -> List[Dict]:
+        """All bookings with customer details, newest first"""
+
+    @abstractmethod
+    def get_bookings_page(self, page_size: int = 50, cursor: Optional[Dict] = None) -> Dict:
+        """One page of bookings, newest first: {"rows", "next_cursor", "total"}"""
+
+    @abstractmethod
+    def search_bookings(self, search_term: str, limit: int = 50) -> List[Dict]:
+        """Bookings matching name, email, phone or booking id, best matches first"""
+
+    @abstractmethod
+    def get_booking_by_id(self, booking_id: int) -> Optional[Dict]:
+        """Get specific booking details"""
+
+    @abstractmethod
+    def iter_bookings(self, date_from: str = None, date_to: str = None,
+                      booking_types: List[str] = None, page_size: int = 1000) -> Iterator[List[Dict]]:
+        """
+        All bookings matching the filters, oldest first, in pages of page_size.
+        For exports: uncached, and errors are raised to the caller.
+        """
+
+    def invalidate_cache(self) -> None:
+        """Drop cached reads; backends without a cache have nothing to do"""
@@ -1,48 +1,73 @@
-from supabase import create_client, Client
+from supabase import Client
+from postgrest.exceptions import APIError
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 import streamlit as st
-from app.config import Config
+from app.resources import get_supabase_client
+from db.base import BaseDatabase
+from db.query_cache import QueryCache
 
-class Database:
+class Database(BaseDatabase):
     """Database operations using Supabase"""
     
-    def __init__(self):
+    def __init__(self, client: Client = None):
+        # Read-through cache: Streamlit reruns the dashboard on every widget interaction
+        self.cache = QueryCache()
+        # create_booking calls that fell back to two requests (create_booking_atomic missing)
+        self.booking_rpc_fallbacks = 0
         try:
-            self.client: Client = create_client(
-                Config.SUPABASE_URL,
-                Config.SUPABASE_KEY
-            )
+            self.client: Client = client or get_supabase_client()
         except Exception as e:
             st.error(f"Database connection failed: {str(e)}")
             self.client = None
     
     def create_customer(self, name: str, email: str, phone: str) -> Optional[int]:
-        """Create or get existing customer"""
+        """Create or get existing customer (latest name/phone win)"""
         try:
-            # Check if customer exists
-            result = self.client.table("customers")\
-                .select("customer_id")\
-                .eq("email", email)\
-                .execute()
-            
-            if result.data:
-                return result.data[0]["customer_id"]
-            
-            # Create new customer
-            result = self.client.table("customers").insert({
+            # Single upsert instead of select-then-insert, which raced under concurrent bookings
+            result = self.client.table("customers").upsert({
                 "name": name,
                 "email": email,
                 "phone": phone
-            }).execute()
+            }, on_conflict="email").execute()
             
+            self.invalidate_cache()
             return result.data[0]["customer_id"]
         except Exception as e:
             st.error(f"Error creating customer: {str(e)}")
             return None
     
     def create_booking(self, booking_data: Dict) -> Optional[int]:
-        """Create a new booking"""
+        """Create a new booking (customer upsert + booking insert in one round trip)"""
+        try:
+            result = self.client.rpc("create_booking_atomic", {
+                "p_name": booking_data["name"],
+                "p_email": booking_data["email"],
+                "p_phone": booking_data["phone"],
+                "p_booking_type": booking_data["booking_type"],
+                "p_date": booking_data["date"],
+                "p_time": booking_data["time"],
+                # Same clock as the sequential fallback and older rows - keyset pagination orders on it
+                "p_created_at": datetime.now().isoformat()
+            }).execute()
+            self.invalidate_cache()
+            return result.data
+        except APIError as e:
+            # PGRST202: function missing - db/schema.sql hasn't been re-run on this project yet
+            if e.code == "PGRST202":
+                self.booking_rpc_fallbacks += 1
+                return self._create_booking_sequential(booking_data)
+            if e.code == "23505":
+                st.error("That time slot was just booked by someone else. Please choose another time.")
+                return None
+            st.error(f"Error creating booking: {str(e)}")
+            return None
+        except Exception as e:
+            st.error(f"Error creating booking: {str(e)}")
+            return None
+    
+    def _create_booking_sequential(self, booking_data: Dict) -> Optional[int]:
+        """Two-request fallback: upsert customer, then insert booking"""
         try:
             # First, create/get customer
             customer_id = self.create_customer(
@@ -64,43 +89,171 @@ class Database:
                 "created_at": datetime.now().isoformat()
             }).execute()
             
+            self.invalidate_cache()
             return result.data[0]["id"]
         except Exception as e:
             st.error(f"Error creating booking: {str(e)}")
             return None
     
+    def get_taken_slots(self, from_date: str) -> Optional[List[Dict]]:
+        """booking_type/date/time of active bookings on or after from_date (None on error)"""
+        try:
+            rows, page = [], 1000  # PostgREST caps responses at 1000 rows by default
+            while True:
+                result = self.client.table("bookings")\
+                    .select("booking_type, date, time")\
+                    .gte("date", from_date)\
+                    .neq("status", "cancelled")\
+                    .order("id")\
+                    .range(len(rows), len(rows) + page - 1)\
+                    .execute()
+                rows.extend(result.data)
+                if len(result.data) < page:
+                    return rows
+        except Exception as e:
+            st.error(f"Error loading availability: {str(e)}")
+            return None
+    
+    def get_booking_stats(self) -> Dict[str, int]:
+        """Dashboard counters: total, today, confirmed, unique_customers"""
+        today = datetime.now().strftime('%Y-%m-%d')
+        try:
+            return self.cache.get_or_load(("booking_stats", today), lambda: self._fetch_booking_stats(today))
+        except Exception as e:
+            st.error(f"Error fetching stats: {str(e)}")
+            return {"total": 0, "today": 0, "confirmed": 0, "unique_customers": 0}
+    
+    def _fetch_booking_stats(self, today: str) -> Dict[str, int]:
+        try:
+            result = self.client.rpc("booking_stats", {"p_today": today}).execute()
+            return result.data[0]
+        except APIError as e:
+            # PGRST202: function missing - db/schema.sql hasn't been re-run on this project yet
+            if e.code != "PGRST202":
+                raise
+            bookings = self.get_all_bookings()
+            return {
+                "total": len(bookings),
+                "today": sum(1 for b in bookings if b.get('date') == today),
+                "confirmed": sum(1 for b in bookings if b.get('status') == 'confirmed'),
+                "unique_customers": len(set(b.get('customer_id') for b in bookings))
+            }
+    
     def get_all_bookings(self) -> List[Dict]:
         """Fetch all bookings with customer details"""
         try:
-            result = self.client.table("bookings")\
-                .select("*, customers(*)")\
-                .order("created_at", desc=True)\
-                .execute()
-            return result.data
+            return self.cache.get_or_load(("all_bookings",), self._fetch_all_bookings)
+        except Exception as e:
+            st.error(f"Error fetching bookings: {str(e)}")
+            return []
+    
+    def _fetch_all_bookings(self) -> List[Dict]:
+        result = self.client.table("bookings")\
+            .select("*, customers(*)")\
+            .order("created_at", desc=True)\
+            .execute()
+        return result.data
+    
+    def get_bookings_page(self, page_size: int = 50, cursor: Optional[Dict] = None) -> Dict:
+        """
+        One page of bookings with customer details, newest first.
+        Keyset pagination on (created_at, id): pass the previous page's next_cursor
+        to continue, so deep pages cost the same as the first one.
+        Returns: {"rows", "next_cursor" (None on the last page), "total" (estimate)}
+        """
+        key = ("bookings_page", page_size, cursor and (cursor["created_at"], cursor["id"]))
+        try:
+            return self.cache.get_or_load(key, lambda: self._fetch_bookings_page(page_size, cursor))
         except Exception as e:
             st.error(f"Error fetching bookings: {str(e)}")
+            return {"rows": [], "next_cursor": None, "total": 0}
+    
+    def _fetch_bookings_page(self, page_size: int, cursor: Optional[Dict]) -> Dict:
+        query = self.client.table("bookings")\
+            .select("*, customers(*)", count="estimated")\
+            .order("created_at", desc=True)\
+            .order("id", desc=True)\
+            .limit(page_size + 1)  # One extra row tells us whether there is a next page
+        
+        if cursor:
+            created_at = f'"{cursor["created_at"]}"'
+            query = query.or_(
+                f"created_at.lt.{created_at},and(created_at.eq.{created_at},id.lt.{cursor['id']})"
+            )
+        
+        result = query.execute()
+        rows = result.data[:page_size]
+        next_cursor = None
+        if len(result.data) > page_size:
+            last = rows[-1]
+            next_cursor = {"created_at": last["created_at"], "id": last["id"]}
+        
+        return {"rows": rows, "next_cursor": next_cursor, "total": result.count or 0}
+    
+    def search_bookings(self, search_term: str, limit: int = 50) -> List[Dict]:
+        """Search bookings by name, email, phone or booking id, best matches first"""
+        try:
+            return self.cache.get_or_load(
+                ("search", search_term, limit), lambda: self._fetch_search(search_term, limit)
+            )
+        except Exception as e:
+            st.error(f"Error searching bookings: {str(e)}")
             return []
     
-    def search_bookings(self, search_term: str) -> List[Dict]:
-        """Search bookings by name or email"""
+    def _fetch_search(self, search_term: str, limit: int) -> List[Dict]:
         try:
+            result = self.client.rpc("search_bookings", {"p_term": search_term, "p_limit": limit}).execute()
+            return result.data
+        except APIError as e:
+            # PGRST202: function missing - db/schema.sql hasn't been re-run on this project yet
+            if e.code != "PGRST202":
+                raise
             result = self.client.table("bookings")\
                 .select("*, customers(*)")\
                 .or_(f"customers.name.ilike.%{search_term}%,customers.email.ilike.%{search_term}%")\
+                .limit(limit)\
                 .execute()
             return result.data
-        except Exception as e:
-            st.error(f"Error searching bookings: {str(e)}")
-            return []
     
     def get_booking_by_id(self, booking_id: int) -> Optional[Dict]:
         """Get specific booking details"""
         try:
-            result = self.client.table("bookings")\
-                .select("*, customers(*)")\
-                .eq("id", booking_id)\
-                .execute()
-            return result.data[0] if result.data else None
+            return self.cache.get_or_load(("booking", booking_id), lambda: self._fetch_booking(booking_id))
         except Exception as e:
             st.error(f"Error fetching booking: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+    
+    def _fetch_booking(self, booking_id: int) -> Optional[Dict]:
+        result = self.client.table("bookings")\
+            .select("*, customers(*)")\
+            .eq("id", booking_id)\
+            .execute()
+        return result.data[0] if result.data else None
+    
+    def iter_bookings(self, date_from: str = None, date_to: str = None,
+                      booking_types: List[str] = None, page_size: int = 1000) -> Iterator[List[Dict]]:
+        """Pages of bookings (keyset on id) with the filters applied in the query"""
+        last_id = 0
+        while True:
+            query = self.client.table("bookings")\
+                .select("*, customers(*)")\
+                .gt("id", last_id)\
+                .order("id")\
+                .limit(page_size)
+            if date_from:
+                query = query.gte("date", date_from)
+            if date_to:
+                query = query.lte("date", date_to)
+            if booking_types:
+                query = query.in_("booking_type", booking_types)
+            
+            rows = query.execute().data
+            if rows:
+                yield rows
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1]["id"]
+    
+    def invalidate_cache(self) -> None:
+        """Drop cached reads, e.g. after a write or on an explicit refresh"""
+        self.cache.clear()
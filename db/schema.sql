@@ -1,5 +1,10 @@
 -- Supabase Schema for AI Booking Assistant
 -- Run these commands in your Supabase SQL Editor
+-- Safe to re-run on an existing project (every statement is idempotent), which is
+-- how the RPC functions and indexes below reach projects created before them
+
+-- Trigram matching for the admin search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 -- Create customers table
 CREATE TABLE IF NOT EXISTS customers (
@@ -26,15 +31,190 @@ CREATE INDEX IF NOT EXISTS idx_customers_email ON customers(email);
 CREATE INDEX IF NOT EXISTS idx_bookings_customer_id ON bookings(customer_id);
 CREATE INDEX IF NOT EXISTS idx_bookings_date ON bookings(date);
 CREATE INDEX IF NOT EXISTS idx_bookings_created_at ON bookings(created_at);
+CREATE INDEX IF NOT EXISTS idx_bookings_created_at_id ON bookings(created_at DESC, id DESC);  -- Dashboard keyset pagination
+
+-- Trigram indexes: serve ILIKE '%term%' and fuzzy matches without a sequential scan
+CREATE INDEX IF NOT EXISTS idx_customers_name_trgm ON customers USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_customers_email_trgm ON customers USING gin (email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_customers_phone_trgm ON customers USING gin (phone gin_trgm_ops);
+
+-- One active booking per department slot (app/availability.py checks first;
+-- this catches two sessions racing for the same slot).
+-- Double bookings made before the index existed are never resolved here: they
+-- are listed in booking_slot_conflicts and the index is skipped (with a warning
+-- naming the booking ids) until staff have cancelled or moved them by hand and
+-- re-run this script.
+CREATE TABLE IF NOT EXISTS booking_slot_conflicts (
+    booking_id INTEGER PRIMARY KEY REFERENCES bookings(id) ON DELETE CASCADE,
+    booking_type VARCHAR(100) NOT NULL,
+    date DATE NOT NULL,
+    time TIME NOT NULL,
+    detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+DO $$
+DECLARE
+    v_booking_ids TEXT;
+BEGIN
+    DELETE FROM booking_slot_conflicts;
+    INSERT INTO booking_slot_conflicts (booking_id, booking_type, date, time)
+    SELECT id, booking_type, date, time
+    FROM (
+        SELECT id, booking_type, date, time,
+               COUNT(*) OVER (PARTITION BY booking_type, date, time) AS bookings_in_slot
+        FROM bookings
+        WHERE status <> 'cancelled'
+    ) active
+    WHERE bookings_in_slot > 1;
+
+    SELECT string_agg(booking_id::TEXT, ', ' ORDER BY booking_id)
+    INTO v_booking_ids
+    FROM booking_slot_conflicts;
+
+    IF v_booking_ids IS NOT NULL THEN
+        RAISE WARNING 'idx_bookings_slot_unique not created: bookings % share a slot. Resolve them (see booking_slot_conflicts) and re-run this script.',
+            v_booking_ids;
+    ELSE
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_bookings_slot_unique
+            ON bookings(booking_type, date, time)
+            WHERE status <> 'cancelled';
+    END IF;
+END;
+$$;
+
+-- Create a booking in one round trip: upsert the customer by email
+-- (latest name/phone win) and insert the booking atomically.
+-- Called from Database.create_booking via RPC. p_created_at is the app's
+-- clock, like every other bookings.created_at (dashboard pagination sorts on it).
+DROP FUNCTION IF EXISTS create_booking_atomic(VARCHAR, VARCHAR, VARCHAR, VARCHAR, DATE, TIME);
+CREATE OR REPLACE FUNCTION create_booking_atomic(
+    p_name VARCHAR,
+    p_email VARCHAR,
+    p_phone VARCHAR,
+    p_booking_type VARCHAR,
+    p_date DATE,
+    p_time TIME,
+    p_created_at TIMESTAMP
+) RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_customer_id INTEGER;
+    v_booking_id INTEGER;
+BEGIN
+    INSERT INTO customers (name, email, phone)
+    VALUES (p_name, p_email, p_phone)
+    ON CONFLICT (email) DO UPDATE
+        SET name = EXCLUDED.name, phone = EXCLUDED.phone
+    RETURNING customer_id INTO v_customer_id;
+
+    INSERT INTO bookings (customer_id, booking_type, date, time, status, created_at)
+    VALUES (v_customer_id, p_booking_type, p_date, p_time, 'confirmed', p_created_at)
+    RETURNING id INTO v_booking_id;
+
+    RETURN v_booking_id;
+END;
+$$;
+
+-- Dashboard counters in one small response (Database.get_booking_stats).
+-- p_today is passed by the app so "today" follows the app's clock.
+CREATE OR REPLACE FUNCTION booking_stats(p_today DATE)
+RETURNS TABLE (total BIGINT, today BIGINT, confirmed BIGINT, unique_customers BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        COUNT(*),
+        COUNT(*) FILTER (WHERE date = p_today),
+        COUNT(*) FILTER (WHERE status = 'confirmed'),
+        COUNT(DISTINCT customer_id)
+    FROM bookings;
+$$;
+
+-- Ranked admin search over customer name, email, phone and booking id
+-- (Database.search_bookings). Rows have the same shape as
+-- select("*, customers(*)") plus a relevance score.
+CREATE OR REPLACE FUNCTION search_bookings(p_term TEXT, p_limit INTEGER DEFAULT 50)
+RETURNS TABLE (
+    id INTEGER,
+    customer_id INTEGER,
+    booking_type VARCHAR,
+    date DATE,
+    time TIME,
+    status VARCHAR,
+    created_at TIMESTAMP,
+    customers JSON,
+    score REAL
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+    v_term TEXT := btrim(p_term);
+    v_digits TEXT := regexp_replace(p_term, '[^0-9]', '', 'g');
+    v_booking_id INTEGER;
+BEGIN
+    IF v_term ~ '^#?[0-9]{1,9}$' THEN
+        v_booking_id := ltrim(v_term, '#')::INTEGER;
+    END IF;
+
+    RETURN QUERY
+    WITH matched AS (
+        SELECT c.*,
+               GREATEST(
+                   word_similarity(v_term, c.name),
+                   word_similarity(v_term, c.email),
+                   CASE WHEN length(v_digits) >= 4 AND c.phone LIKE '%' || v_digits || '%'
+                        THEN 0.9 ELSE 0 END
+               )::REAL AS match_score
+        FROM customers c
+        WHERE c.name ILIKE '%' || v_term || '%'
+           OR c.email ILIKE '%' || v_term || '%'
+           OR v_term <% c.name
+           OR (length(v_digits) >= 4 AND c.phone LIKE '%' || v_digits || '%')
+    ),
+    hits AS (
+        SELECT b.id AS booking_id, m.match_score
+        FROM matched m
+        JOIN bookings b ON b.customer_id = m.customer_id
+        UNION ALL
+        SELECT b.id, 1.0::REAL
+        FROM bookings b
+        WHERE b.id = v_booking_id
+    ),
+    ranked AS (
+        SELECT booking_id, MAX(match_score) AS best
+        FROM hits
+        GROUP BY booking_id
+    )
+    SELECT b.id, b.customer_id, b.booking_type, b.date, b.time, b.status, b.created_at,
+           json_build_object(
+               'customer_id', c.customer_id,
+               'name', c.name,
+               'email', c.email,
+               'phone', c.phone,
+               'created_at', c.created_at
+           ),
+           r.best
+    FROM ranked r
+    JOIN bookings b ON b.id = r.booking_id
+    JOIN customers c ON c.customer_id = b.customer_id
+    ORDER BY r.best DESC, b.created_at DESC
+    LIMIT p_limit;
+END;
+$$;
 
 -- Enable Row Level Security (optional but recommended)
 ALTER TABLE customers ENABLE ROW LEVEL SECURITY;
 ALTER TABLE bookings ENABLE ROW LEVEL SECURITY;
+ALTER TABLE booking_slot_conflicts ENABLE ROW LEVEL SECURITY;  -- No policy: SQL Editor only
 
 -- Create policies (adjust based on your security needs)
 -- For development, you can allow all operations
+DROP POLICY IF EXISTS "Allow all operations on customers" ON customers;
 CREATE POLICY "Allow all operations on customers" ON customers
     FOR ALL USING (true) WITH CHECK (true);
 
+DROP POLICY IF EXISTS "Allow all operations on bookings" ON bookings;
 CREATE POLICY "Allow all operations on bookings" ON bookings
     FOR ALL USING (true) WITH CHECK (true);
\ No newline at end of file
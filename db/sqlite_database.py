@@ -0,0 +1,275 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+import streamlit as st
+from app.config import Config
+from db.base import BaseDatabase
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    customer_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    phone TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS bookings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer_id INTEGER REFERENCES customers(customer_id) ON DELETE CASCADE,
+    booking_type TEXT NOT NULL,
+    date TEXT NOT NULL,
+    time TEXT NOT NULL,
+    status TEXT DEFAULT 'confirmed',
+    created_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_bookings_customer_id ON bookings(customer_id);
+CREATE INDEX IF NOT EXISTS idx_bookings_date ON bookings(date);
+CREATE INDEX IF NOT EXISTS idx_bookings_created_at_id ON bookings(created_at DESC, id DESC);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_bookings_slot_unique
+    ON bookings(booking_type, date, time)
+    WHERE status <> 'cancelled';
+"""
+
+BOOKING_COLUMNS = """
+    b.id, b.customer_id, b.booking_type, b.date, b.time, b.status, b.created_at,
+    c.name, c.email, c.phone, c.created_at AS customer_created_at
+"""
+
+
+class SQLiteDatabase(BaseDatabase):
+    """
+    Embedded backend: a local SQLite file in WAL mode (readers never block the
+    writer). Mirrors db/schema.sql, minus the Postgres-only search features.
+    For single-node deployments and offline benchmarks.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.SQLITE_DB_PATH
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread - sqlite3 connections aren't shareable across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL; fsync at checkpoints only
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _booking(row: sqlite3.Row) -> Dict:
+        """Row of BOOKING_COLUMNS -> Supabase-shaped booking dict"""
+        return {
+            "id": row["id"],
+            "customer_id": row["customer_id"],
+            "booking_type": row["booking_type"],
+            "date": row["date"],
+            "time": row["time"],
+            "status": row["status"],
+            "created_at": row["created_at"],
+            "customers": {
+                "customer_id": row["customer_id"],
+                "name": row["name"],
+                "email": row["email"],
+                "phone": row["phone"],
+                "created_at": row["customer_created_at"]
+            }
+        }
+
+    @staticmethod
+    def _upsert_customer(conn: sqlite3.Connection, name: str, email: str, phone: str) -> int:
+        return conn.execute(
+            "INSERT INTO customers (name, email, phone, created_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (email) DO UPDATE SET name = excluded.name, phone = excluded.phone "
+            "RETURNING customer_id",
+            (name, email, phone, datetime.now().isoformat())
+        ).fetchone()[0]
+
+    def create_customer(self, name: str, email: str, phone: str) -> Optional[int]:
+        """Create or get existing customer (latest name/phone win)"""
+        try:
+            return self._upsert_customer(self._conn(), name, email, phone)
+        except Exception as e:
+            st.error(f"Error creating customer: {str(e)}")
+            return None
+
+    def create_booking(self, booking_data: Dict) -> Optional[int]:
+        """Create a new booking (customer upsert + booking insert in one transaction)"""
+        conn = self._conn()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                customer_id = self._upsert_customer(
+                    conn, booking_data["name"], booking_data["email"], booking_data["phone"]
+                )
+                booking_id = conn.execute(
+                    "INSERT INTO bookings (customer_id, booking_type, date, time, status, created_at) "
+                    "VALUES (?, ?, ?, ?, 'confirmed', ?)",
+                    (
+                        customer_id,
+                        booking_data["booking_type"],
+                        booking_data["date"],
+                        f"{booking_data['time'][:5]}:00",  # Stored as HH:MM:SS, like Postgres TIME
+                        datetime.now().isoformat()
+                    )
+                ).lastrowid
+                conn.execute("COMMIT")
+                return booking_id
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.IntegrityError:
+            st.error("That time slot was just booked by someone else. Please choose another time.")
+            return None
+        except Exception as e:
+            st.error(f"Error creating booking: {str(e)}")
+            return None
+
+    def get_taken_slots(self, from_date: str) -> Optional[List[Dict]]:
+        """booking_type/date/time of active bookings on or after from_date (None on error)"""
+        try:
+            rows = self._conn().execute(
+                "SELECT booking_type, date, time FROM bookings WHERE date >= ? AND status <> 'cancelled'",
+                (from_date,)
+            ).fetchall()
+            return [dict(row) for row in rows]
+        except Exception as e:
+            st.error(f"Error loading availability: {str(e)}")
+            return None
+
+    def get_booking_stats(self) -> Dict[str, int]:
+        """Dashboard counters: total, today, confirmed, unique_customers"""
+        try:
+            row = self._conn().execute(
+                "SELECT COUNT(*) AS total, "
+                "COALESCE(SUM(date = ?), 0) AS today, "
+                "COALESCE(SUM(status = 'confirmed'), 0) AS confirmed, "
+                "COUNT(DISTINCT customer_id) AS unique_customers "
+                "FROM bookings",
+                (datetime.now().strftime('%Y-%m-%d'),)
+            ).fetchone()
+            return dict(row)
+        except Exception as e:
+            st.error(f"Error fetching stats: {str(e)}")
+            return {"total": 0, "today": 0, "confirmed": 0, "unique_customers": 0}
+
+    def get_all_bookings(self) -> List[Dict]:
+        """Fetch all bookings with customer details"""
+        try:
+            rows = self._conn().execute(
+                f"SELECT {BOOKING_COLUMNS} FROM bookings b "
+                "JOIN customers c ON c.customer_id = b.customer_id "
+                "ORDER BY b.created_at DESC"
+            ).fetchall()
+            return [self._booking(row) for row in rows]
+        except Exception as e:
+            st.error(f"Error fetching bookings: {str(e)}")
+            return []
+
+    def get_bookings_page(self, page_size: int = 50, cursor: Optional[Dict] = None) -> Dict:
+        """One page of bookings, newest first, keyset-paginated on (created_at, id)"""
+        try:
+            conn = self._conn()
+            where, params = "", []
+            if cursor:
+                where = "WHERE (b.created_at, b.id) < (?, ?)"
+                params = [cursor["created_at"], cursor["id"]]
+
+            rows = conn.execute(
+                f"SELECT {BOOKING_COLUMNS} FROM bookings b "
+                f"JOIN customers c ON c.customer_id = b.customer_id {where} "
+                "ORDER BY b.created_at DESC, b.id DESC LIMIT ?",
+                params + [page_size + 1]
+            ).fetchall()
+            bookings = [self._booking(row) for row in rows[:page_size]]
+
+            next_cursor = None
+            if len(rows) > page_size:
+                last = bookings[-1]
+                next_cursor = {"created_at": last["created_at"], "id": last["id"]}
+
+            total = conn.execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+            return {"rows": bookings, "next_cursor": next_cursor, "total": total}
+        except Exception as e:
+            st.error(f"Error fetching bookings: {str(e)}")
+            return {"rows": [], "next_cursor": None, "total": 0}
+
+    def search_bookings(self, search_term: str, limit: int = 50) -> List[Dict]:
+        """Search bookings by name, email, phone or booking id, best matches first"""
+        term = search_term.strip()
+        digits = "".join(ch for ch in term if ch.isdigit())
+        booking_id = int(term.lstrip("#")) if term.lstrip("#").isdigit() else None
+        pattern = f"%{term}%"
+        digits_pattern = f"%{digits}%" if len(digits) >= 4 else None
+
+        try:
+            # No trigram index here: LIKE is a scan, fine at single-node sizes.
+            # Rank: booking id > prefix of name/email > phone > substring
+            rows = self._conn().execute(
+                f"SELECT {BOOKING_COLUMNS}, "
+                "CASE WHEN b.id = :id THEN 1.0 "
+                "     WHEN c.name LIKE :prefix OR c.email LIKE :prefix THEN 0.8 "
+                "     WHEN c.phone LIKE :digits THEN 0.7 "
+                "     ELSE 0.5 END AS score "
+                "FROM bookings b JOIN customers c ON c.customer_id = b.customer_id "
+                "WHERE b.id = :id OR c.name LIKE :pattern OR c.email LIKE :pattern OR c.phone LIKE :digits "
+                "ORDER BY score DESC, b.created_at DESC LIMIT :limit",
+                {"id": booking_id, "prefix": f"{term}%", "pattern": pattern,
+                 "digits": digits_pattern, "limit": limit}
+            ).fetchall()
+            return [dict(self._booking(row), score=row["score"]) for row in rows]
+        except Exception as e:
+            st.error(f"Error searching bookings: {str(e)}")
+            return []
+
+    def iter_bookings(self, date_from: str = None, date_to: str = None,
+                      booking_types: List[str] = None, page_size: int = 1000) -> Iterator[List[Dict]]:
+        """Pages of bookings (keyset on id) with the filters applied in the query"""
+        conditions, params = ["b.id > ?"], []
+        if date_from:
+            conditions.append("b.date >= ?")
+            params.append(date_from)
+        if date_to:
+            conditions.append("b.date <= ?")
+            params.append(date_to)
+        if booking_types:
+            conditions.append(f"b.booking_type IN ({', '.join('?' * len(booking_types))})")
+            params.extend(booking_types)
+        query = (
+            f"SELECT {BOOKING_COLUMNS} FROM bookings b "
+            f"JOIN customers c ON c.customer_id = b.customer_id "
+            f"WHERE {' AND '.join(conditions)} ORDER BY b.id LIMIT ?"
+        )
+
+        last_id = 0
+        while True:
+            rows = self._conn().execute(query, [last_id] + params + [page_size]).fetchall()
+            if rows:
+                yield [self._booking(row) for row in rows]
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1]["id"]
+
+    def get_booking_by_id(self, booking_id: int) -> Optional[Dict]:
+        """Get specific booking details"""
+        try:
+            row = self._conn().execute(
+                f"SELECT {BOOKING_COLUMNS} FROM bookings b "
+                "JOIN customers c ON c.customer_id = b.customer_id WHERE b.id = ?",
+                (booking_id,)
+            ).fetchone()
+            return self._booking(row) if row else None
+        except Exception as e:
+            st.error(f"Error fetching booking: {str(e)}")
+            return None
@@ -2,7 +2,7 @@ import streamlit as st
 from app.config import Config
 from app.chat_logic import ChatLogic
 from app.admin_dashboard import AdminDashboard
-from app.tools import Tools
+from app.resources import get_answer_cache, get_email_outbox, get_llm_cache, get_llm_gateway, get_local_router, get_smtp_pool
 
 # Page config
 st.set_page_config(
@@ -46,8 +46,6 @@ def initialize_session_state():
         st.session_state.booking_confirmed = False
     if 'chat_logic' not in st.session_state:
         st.session_state.chat_logic = ChatLogic()
-    if 'tools' not in st.session_state:
-        st.session_state.tools = Tools()
 
 def render_sidebar():
     """Render sidebar with PDF upload and info"""
@@ -322,11 +320,39 @@ Let me help you book manually instead. May I have your full name?"""
             st.write(f"⏰ {Config.WORKING_HOURS['start']} - {Config.WORKING_HOURS['end']}")
             st.write("📅 Monday to Saturday")
         
+        with st.expander("📈 Performance"):
+            answer_stats = get_answer_cache().stats()
+            st.write(f"⚡ Answer cache: {answer_stats['hits']} hits / {answer_stats['misses']} misses "
+                     f"({answer_stats['hit_rate']:.0%} hit rate)")
+            llm_stats = get_llm_cache().stats()
+            st.write(f"🧠 LLM response cache: {llm_stats['hits']} hits / {llm_stats['misses']} misses, "
+                     f"{llm_stats['bytes_saved'] / 1024:.1f} KB and {llm_stats['latency_saved']:.1f}s saved")
+            gateway_stats = get_llm_gateway().stats()
+            st.write(f"🌐 LLM calls: {gateway_stats['calls']} ({gateway_stats['failed']} failed, "
+                     f"{gateway_stats['retries']} retries, {gateway_stats['hedges']} hedged), "
+                     f"p50 {gateway_stats['p50_ms']:.0f} ms / p95 {gateway_stats['p95_ms']:.0f} ms")
+            if Config.LOCAL_ROUTER:
+                router_stats = get_local_router().stats()
+                st.write(f"🧭 Local answers: {router_stats['answered']} of "
+                         f"{router_stats['answered'] + router_stats['passed']} LLM-bound messages "
+                         f"({router_stats['avoided_rate']:.0%} of LLM calls avoided)")
+            smtp_stats = get_smtp_pool().stats()
+            outbox = get_email_outbox()[0]
+            outbox_counts = outbox.counts()
+            st.write(f"📧 Email: {smtp_stats['sent']} sent, {smtp_stats['failed']} failed, "
+                     f"p50 {smtp_stats['p50_ms']:.0f} ms / p95 {smtp_stats['p95_ms']:.0f} ms per send")
+            st.write(f"📬 Queue depth: {outbox_counts.get('pending', 0) + outbox_counts.get('sending', 0)} queued, "
+                     f"{smtp_stats['waiting']} waiting for a session")
+            outbox_error = outbox.last_error()
+            if outbox_error:
+                st.write(f"⚠️ Last email error ({outbox_counts.get('failed', 0)} given up): {outbox_error}")
+        
         st.markdown("---")
         
         # Clear chat button
         if st.button("🗑️ Clear Chat", use_container_width=True):
             st.session_state.messages = []
+            st.session_state.history_summary = {}
             st.session_state.chat_logic.booking_flow.reset_booking()
             st.session_state.booking_mode = None
             st.session_state.pdf_uploaded = False
@@ -355,9 +381,14 @@ def render_chat():
             with st.spinner("Thinking..."):
                 response = st.session_state.chat_logic.handle_message(
                     prompt,
-                    st.session_state.messages
+                    st.session_state.messages,
+                    stream=True
                 )
-            st.markdown(response)
+            if isinstance(response, str):
+                st.markdown(response)
+            else:
+                # LLM replies stream token by token; write_stream returns the full text
+                response = st.write_stream(response)
         
         # Add assistant message
         st.session_state.messages.append({"role": "assistant", "content": response})